@@ -10,9 +10,19 @@ Tujuan:
 """
 
 import pandas as pd
-import fitz  # PyMuPDF
-from sqlalchemy import create_engine, exc
+import pdf_cache
+import load_metrics
+from bulk_load import copy_dataframe, ensure_unique_key, upsert_dataframe
+from sqlalchemy import exc
+from db import get_engine
+from tweet_reader import read_tweets
+from staging_partitions import PARTITIONED_TABLES, ensure_frame_partitions, prepare_partitions
+from staging_schema import STAGING_TABLES, ensure_staging_table
+from validation import quarantine, validate
 import re
+import concurrent.futures
+import os
+import time
 from pathlib import Path
 from datetime import datetime
 import logging
@@ -26,25 +36,42 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data_lake" / "adventureworks" / "organized"
 OUTPUT_DIR = BASE_DIR / "data_lake" / "adventureworks" / "processed"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# Baris per chunk untuk mode streaming CSV sensor
+STREAM_CHUNK_ROWS = 100_000
 
-# Konfigurasi database
-DB_CONFIG = {
-    'dbname': 'staging',
-    'user': 'postgres',
-    'password': 'chriscakra15',
-    'host': 'localhost',
-    'port': '5432'
-}
+# Natural key tiap tabel staging (dari staging_schema); mode 'merge' melakukan upsert pada kunci ini
+STAGING_KEYS = {table_name: spec['key'] for table_name, spec in STAGING_TABLES.items()}
+# 'merge' (idempotent, default) atau 'append' (perilaku lama, bisa duplikat)
+LOAD_MODE = 'merge'
+# Percobaan ulang load_to_database bila koneksi database putus di tengah transaksi
+LOAD_RETRIES = 2
 
 def get_database_connection():
-    """Membuat koneksi ke database"""
+    """Engine staging bersama (pool dari db.py)"""
     try:
-        conn_str = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
-        return create_engine(conn_str)
+        return get_engine('staging')
     except Exception as e:
         logger.error(f"Gagal terhubung ke database: {e}")
         raise
 
+def clean_sensor_frame(df):
+    """Konversi tipe data sensor suhu; None jika kolom wajib tidak ada.
+
+    Nilai yang gagal dikonversi menjadi NaN/NaT dan tidak dibuang di sini:
+    baris tersebut ditolak oleh aturan di validation.py dan dikarantina.
+    """
+    # Pastikan kolom yang diperlukan ada
+    required = ['timestamp', 'sensor_id', 'temperature_c']
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        logger.error(f"Kolom yang diperlukan tidak ditemukan: {missing}")
+        return None
+
+    # Pastikan tipe data sesuai
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    df['temperature_c'] = pd.to_numeric(df['temperature_c'], errors='coerce')
+    return df
+
 def process_csv_file(csv_path):
     """Memproses file CSV"""
     try:
@@ -53,19 +80,9 @@ def process_csv_file(csv_path):
         
         # Handle warehouse temperature sensor data
         if 'warehouse_temp_sensor' in str(csv_path):
-            # Pastikan kolom yang diperlukan ada
-            required = ['timestamp', 'sensor_id', 'temperature_c']
-            missing = [col for col in required if col not in df.columns]
-            if missing:
-                logger.error(f"Kolom yang diperlukan tidak ditemukan: {missing}")
+            df = clean_sensor_frame(df)
+            if df is None:
                 return None, None
-                
-            # Pastikan tipe data sesuai
-            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-            df['temperature_c'] = pd.to_numeric(df['temperature_c'], errors='coerce')
-            
-            # Hapus baris dengan data yang tidak valid
-            df = df.dropna(subset=['timestamp', 'sensor_id', 'temperature_c'])
         
         # Simpan ke CSV yang sudah diproses
         output_path = OUTPUT_DIR / f"processed_{csv_path.name}"
@@ -76,51 +93,100 @@ def process_csv_file(csv_path):
         logger.error(f"Gagal memproses file CSV {csv_path}: {e}")
         return None, None
 
+def prepare_staging(df, table_name, conn, mode=LOAD_MODE):
+    """DDL & cek katalog tabel staging, sekali per tabel per load (bukan per chunk)
+
+    Menyesuaikan skema & partisi tabel dan, untuk 'merge', unique index
+    natural key. ``df`` (mis. chunk pertama) hanya dipakai untuk membuat
+    tabel tanpa deklarasi skema dari dtype-nya.
+    """
+    if mode not in ('merge', 'append'):
+        raise ValueError(f"Mode load tidak dikenal: {mode}")
+    if not ensure_staging_table(conn, table_name) and table_name not in PARTITIONED_TABLES:
+        copy_dataframe(df.iloc[0:0], table_name, conn, if_exists='append')
+    prepare_partitions(conn, table_name, df)
+    if mode == 'merge' and table_name in STAGING_KEYS:
+        ensure_unique_key(conn, table_name, STAGING_KEYS[table_name])
+
+def write_staging(df, table_name, conn, mode=LOAD_MODE):
+    """Tulis DataFrame/chunk ke tabel staging dengan mode 'merge' (upsert natural key) atau 'append'
+
+    prepare_staging harus sudah dijalankan untuk tabel ini di transaksi yang
+    sama; per chunk hanya partisi untuk jendela waktunya yang dipastikan ada.
+    """
+    ensure_frame_partitions(conn, table_name, df)
+    if mode == 'merge' and table_name in STAGING_KEYS:
+        return upsert_dataframe(df, table_name, conn, STAGING_KEYS[table_name], prepared=True)
+    return copy_dataframe(df, table_name, conn, if_exists='append', prepared=True)
+
+def quarantine_invalid(df, table_name, conn, raw=None, source=None):
+    """Jalankan aturan validasi tabel atas seluruh frame; baris gagal masuk staging_quarantine.
+
+    ``raw`` adalah frame sebelum konversi tipe (untuk membedakan nilai kosong
+    dari nilai yang tidak bisa di-parse). Mengembalikan baris yang valid.
+    """
+    valid, rejected = validate(df, table_name, raw)
+    quarantine(conn, rejected, table_name, source)
+    return valid
+
+def stream_csv_file(csv_path, table_name='staging_warehouse_temp_sensor', chunk_size=STREAM_CHUNK_ROWS,
+                    mode=LOAD_MODE):
+    """Memproses CSV sensor per chunk: validasi, tulis ke processed CSV & staging, lalu chunk berikutnya.
+
+    Memori tetap sebesar satu chunk berapapun ukuran file. Semua chunk
+    dimuat dalam satu transaksi dan file processed ditulis ke ``.part``
+    lalu di-rename, jadi kegagalan di tengah tidak meninggalkan data setengah.
+    Mengembalikan (jumlah baris dimuat, output_path) atau (None, None).
+    """
+    output_path = OUTPUT_DIR / f"processed_{Path(csv_path).name}"
+    partial_path = output_path.with_name(output_path.name + f'.{os.getpid()}.part')
+    rows_loaded = 0
+    try:
+        logger.info(f"Memproses file CSV (streaming, {chunk_size} baris/chunk): {csv_path}")
+        engine = get_database_connection()
+        with engine.begin() as conn, partial_path.open('w', encoding='utf-8', newline='') as out:
+            for chunk_no, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size)):
+                raw = chunk.copy()
+                chunk = clean_sensor_frame(chunk)
+                if chunk is None:
+                    raise ValueError(f"Kolom wajib tidak lengkap di {csv_path}")
+                chunk = prepare_staging_frame(chunk, table_name)
+                if chunk is None:
+                    raise ValueError(f"Chunk {chunk_no} tidak valid untuk {table_name}")
+                with load_metrics.measure(table_name, chunk_no) as sample:
+                    chunk = quarantine_invalid(chunk, table_name, conn, raw=raw, source=csv_path)
+                    chunk.to_csv(out, index=False, header=chunk_no == 0)
+                    if chunk_no == 0:
+                        prepare_staging(chunk, table_name, conn, mode)
+                    write_staging(chunk, table_name, conn, mode)
+                    sample.rows = len(chunk)
+                rows_loaded += sample.rows
+        os.replace(partial_path, output_path)
+        logger.info(f"Berhasil memuat {rows_loaded} baris ke tabel {table_name}")
+        return rows_loaded, output_path
+    except Exception as e:
+        logger.error(f"Gagal memproses file CSV {csv_path} secara streaming: {e}", exc_info=True)
+        partial_path.unlink(missing_ok=True)
+        return None, None
+
 def process_txt_file(txt_path):
     """Memproses file teks (tweet data)"""
     try:
         logger.info(f"Memproses file TXT: {txt_path}")
         
-        # Baca dan parse data tweet
-        df = pd.read_csv(
-            txt_path, 
-            sep='\t', 
-            header=None, 
-            names=[
-                'tweet_id', 
-                'tweet_text', 
-                'timestamp', 
-                'user_location', 
-                'sentiment', 
-                'matched_product'
-            ]
-        )
-        
-        # Validasi kolom yang diperlukan
-        required = ['tweet_id', 'tweet_text', 'timestamp', 'user_location', 'sentiment', 'matched_product']
-        missing = [col for col in required if col not in df.columns]
-        if missing:
-            logger.error(f"Kolom yang diperlukan tidak ditemukan: {missing}")
-            return None, None
-        
-        # Cleaning dan validasi data
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df['tweet_text'] = df['tweet_text'].str.strip()
-        df['user_location'] = df['user_location'].fillna('Unknown').str.strip()
-        df['sentiment'] = df['sentiment'].str.lower().str.strip()
-        df['matched_product'] = df['matched_product'].fillna('Unknown').str.strip()
-        
-        # Hapus baris dengan data yang tidak valid
-        df = df.dropna(subset=['tweet_id', 'tweet_text', 'timestamp', 'sentiment'])
+        # Baca & normalisasi tweet dalam satu pass (dtype eksplisit, kategori);
+        # baris tidak lengkap ditolak saat load oleh validation.py
+        df, raw = read_tweets(txt_path, drop_incomplete=False, with_raw=True)
         
         # Simpan ke CSV yang sudah diproses
         output_path = OUTPUT_DIR / f"tweet_analysis_{datetime.now().strftime('%Y%m%d')}.csv"
         df.to_csv(output_path, index=False)
         
-        return df, output_path
+        # Nilai mentah ikut dikembalikan agar id/timestamp rusak dikarantina sebagai 'unparseable'
+        return df, output_path, raw
     except Exception as e:
         logger.error(f"Gagal memproses file TXT {txt_path}: {e}")
-        return None, None
+        return None, None, None
 
 def process_market_share_pdf(pdf_path):
     """
@@ -134,14 +200,10 @@ def process_market_share_pdf(pdf_path):
         logger.info(f"Memproses laporan market share: {pdf_path}")
         
         def extract_table_from_pdf(path):
-            """Mengekstrak tabel dari PDF"""
-            with fitz.open(path) as doc:
-                all_tables = []
-                for page in doc:
-                    # Dapatkan tabel dari halaman
-                    tables = page.find_tables()
-                    if tables.tables:
-                        all_tables.extend([table.extract() for table in tables])
+            """Mengekstrak tabel dari PDF (lewat cache halaman PDF)"""
+            all_tables = []
+            for page_tables in pdf_cache.page_tables(path):
+                all_tables.extend(page_tables)
             return all_tables
         
         def find_market_share_table(tables):
@@ -227,59 +289,129 @@ def process_market_share_pdf(pdf_path):
         logger.error(f"Gagal memproses laporan market share: {e}", exc_info=True)
         return None, None
 
-def load_to_database(df, table_name):
-    """Memuat data ke database staging"""
+def prepare_staging_frame(df, table_name):
+    """Validasi kolom wajib & tipe data sebelum dimuat ke tabel staging; None jika tidak valid"""
+    # Pastikan kolom yang diperlukan ada
+    required_columns = {
+        'staging_market_share_report': ['time_periode', 'competitor', 'market_share_percent', 'extraction_date'],
+        'staging_warehouse_temp_sensor': ['timestamp', 'sensor_id', 'temperature_c'],
+        'staging_external_sentiment': ['tweet_id', 'tweet_text', 'timestamp', 'user_location', 'sentiment', 'matched_product']
+    }
+    
+    # Validasi kolom yang diperlukan
+    if table_name in required_columns:
+        # Tambahkan extraction_date untuk market share report jika belum ada
+        if table_name == 'staging_market_share_report' and 'extraction_date' not in df.columns:
+            df['extraction_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+        missing_cols = [col for col in required_columns[table_name] if col not in df.columns]
+        if missing_cols:
+            logger.error(f"Kolom yang diperlukan tidak ditemukan: {missing_cols}")
+            return None
+    
+    # Pastikan tipe data sesuai (nilai tidak valid ditolak oleh aturan validasi, bukan dibuang diam-diam)
+    if 'market_share_percent' in df.columns:
+        df['market_share_percent'] = pd.to_numeric(df['market_share_percent'], errors='coerce')
+    return df
+
+def load_to_database(df, table_name, mode=LOAD_MODE, raw=None):
+    """Memuat data ke database staging ('merge': upsert pada STAGING_KEYS, 'append': tambah saja)
+
+    ``raw`` (opsional) adalah frame sebelum konversi tipe, diteruskan ke validasi.
+    """
     try:
         engine = get_database_connection()
         
-        # Pastikan kolom yang diperlukan ada
-        required_columns = {
-            'staging_market_share_report': ['time_periode', 'competitor', 'market_share_percent', 'extraction_date'],
-            'staging_warehouse_temp_sensor': ['timestamp', 'sensor_id', 'temperature_c'],
-            'staging_external_sentiment': ['tweet_id', 'tweet_text', 'timestamp', 'user_location', 'sentiment', 'matched_product']
-        }
-        
-        # Validasi kolom yang diperlukan
-        if table_name in required_columns:
-            # Tambahkan extraction_date untuk market share report jika belum ada
-            if table_name == 'staging_market_share_report' and 'extraction_date' not in df.columns:
-                df['extraction_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                
-            missing_cols = [col for col in required_columns[table_name] if col not in df.columns]
-            if missing_cols:
-                logger.error(f"Kolom yang diperlukan tidak ditemukan: {missing_cols}")
-                return False
+        df = prepare_staging_frame(df, table_name)
+        if df is None:
+            return False
         
-        # Pastikan tipe data sesuai
-        if 'market_share_percent' in df.columns:
-            df['market_share_percent'] = pd.to_numeric(df['market_share_percent'], errors='coerce')
-            df = df.dropna(subset=['market_share_percent'])
-        
-        # Load ke database
-        with engine.connect() as conn:
-            # Gunakan if_exists='append' untuk menambahkan data ke tabel yang sudah ada
-            df.to_sql(
-                name=table_name,
-                con=conn,
-                if_exists='append',
-                index=False,
-                method='multi',
-                chunksize=1000
-            )
-            
-            # Commit transaksi
-            conn.commit()
+        # Load ke database; transaksi diulang utuh bila koneksi putus (rollback otomatis saat keluar blok)
+        with load_metrics.measure(table_name) as sample:
+            for attempt in range(LOAD_RETRIES + 1):
+                try:
+                    with engine.connect() as conn:
+                        # Baris yang melanggar aturan validasi dikarantina dalam transaksi yang sama
+                        valid = quarantine_invalid(df, table_name, conn, raw=raw)
+                        
+                        # COPY ke tabel sementara lalu INSERT ... ON CONFLICT (atau COPY langsung untuk 'append')
+                        prepare_staging(valid, table_name, conn, mode)
+                        write_staging(valid, table_name, conn, mode)
+                        
+                        # Commit transaksi
+                        conn.commit()
+                    break
+                except exc.OperationalError as e:
+                    if not e.connection_invalidated or attempt == LOAD_RETRIES:
+                        raise
+                    sample.retries += 1
+                    logger.warning(f"Koneksi terputus saat memuat {table_name}, mencoba ulang ({attempt + 1}/{LOAD_RETRIES}): {e}")
+                    time.sleep(2 ** attempt)
+            sample.rows = len(valid)
         
-        logger.info(f"Berhasil memuat {len(df)} baris ke tabel {table_name}")
+        logger.info(f"Berhasil memuat {len(valid)} baris ke tabel {table_name}")
         return True
         
     except Exception as e:
         logger.error(f"Gagal memuat data ke database: {e}", exc_info=True)
-        if 'conn' in locals():
-            conn.rollback()
         return False
 
-def main():
+# Pemroses untuk setiap tabel staging (dipakai sources.json → staging_table)
+STAGING_PROCESSORS = {
+    'staging_warehouse_temp_sensor': process_csv_file,
+    'staging_external_sentiment': process_txt_file,
+    'staging_market_share_report': process_market_share_pdf,
+}
+
+# Tabel yang dimuat per chunk tanpa menahan seluruh file di memori
+STREAMING_PROCESSORS = {
+    'staging_warehouse_temp_sensor': stream_csv_file,
+}
+
+def stage_file(path, table_name, streaming=True, mode=LOAD_MODE):
+    """Memproses satu file dan memuat hasilnya ke tabel staging yang sesuai"""
+    if streaming and table_name in STREAMING_PROCESSORS:
+        rows, _ = STREAMING_PROCESSORS[table_name](Path(path), table_name, mode=mode)
+        return rows is not None
+    processor = STAGING_PROCESSORS.get(table_name)
+    if processor is None:
+        logger.error(f"Tidak ada pemroses untuk tabel staging {table_name}")
+        return False
+    # Pemroses mengembalikan (df, output_path) atau (df, output_path, raw)
+    df, _, *raw = processor(Path(path))
+    if df is None:
+        return False
+    return load_to_database(df, table_name, mode=mode, raw=raw[0] if raw else None)
+
+# Sumber yang diproses oleh main(): (label, nama file di DATA_DIR, tabel staging)
+ANALYZE_SOURCES = [
+    ('sensor', 'warehouse_temp_sensor.csv', 'staging_warehouse_temp_sensor'),
+    ('tweet', 'adventureworks_structured_150_tweets.txt', 'staging_external_sentiment'),
+    ('market share', 'market_share_report.pdf', 'staging_market_share_report'),
+]
+
+def _timed_stage(path, table_name, mode):
+    """Jalankan stage_file; kembalikan (berhasil, detik, pesan error, sampel metrik load).
+
+    Sampel metrik ikut dikembalikan karena worker berjalan di proses lain;
+    proses induk mengumpulkan dan menulisnya ke file metrik.
+    """
+    started = time.perf_counter()
+    try:
+        ok = stage_file(path, table_name, mode=mode)
+        return ok, time.perf_counter() - started, None, load_metrics.drain()
+    except Exception as e:
+        logger.error(f"Gagal memproses {path}: {e}", exc_info=True)
+        return False, time.perf_counter() - started, str(e), load_metrics.drain()
+
+def main(workers=None, mode=LOAD_MODE):
+    """Analisis semua sumber secara paralel: tiap sumber di-parse dan dimuat di prosesnya sendiri.
+
+    Setiap worker memakai koneksi pool-nya sendiri, jadi parsing satu sumber
+    tumpang tindih dengan load sumber lain dan total waktu mendekati sumber
+    paling lambat. Kegagalan satu sumber tidak menghentikan yang lain.
+    ``workers=1`` menjalankan semuanya berurutan di proses ini.
+    """
     try:
         logger.info("Memulai proses analisis data...")
         
@@ -288,62 +420,70 @@ def main():
             logger.error(f"Direktori data tidak ditemukan: {DATA_DIR}")
             return
         
-        # Proses file sensor suhu gudang
-        sensor_file = DATA_DIR / "warehouse_temp_sensor.csv"
-        if sensor_file.exists():
-            try:
-                logger.info(f"Memproses file sensor: {sensor_file}")
-                df_sensor, _ = process_csv_file(sensor_file)
-                
-                # Load to database
-                if load_to_database(df_sensor, "staging_warehouse_temp_sensor"):
-                    logger.info("✅ Data sensor berhasil dimuat ke staging_warehouse_temp_sensor")
-                else:
-                    logger.error("❌ Gagal memuat data sensor ke database")
-            except Exception as e:
-                logger.error(f"Gagal memproses file sensor: {e}", exc_info=True)
-        else:
-            logger.warning(f"File sensor tidak ditemukan: {sensor_file}")
+        sources = []
+        for label, filename, table_name in ANALYZE_SOURCES:
+            path = DATA_DIR / filename
+            if path.exists():
+                logger.info(f"Memproses file {label}: {path}")
+                sources.append((label, path, table_name))
+            else:
+                logger.warning(f"File {label} tidak ditemukan: {path}")
         
-        # Proses file tweet
-        tweet_file = DATA_DIR / "adventureworks_structured_150_tweets.txt"
-        if tweet_file.exists():
-            try:
-                logger.info(f"Memproses file tweet: {tweet_file}")
-                df_tweet, _ = process_txt_file(tweet_file)
-                
-                # Load to database
-                if load_to_database(df_tweet, "staging_external_sentiment"):
-                    logger.info("✅ Data tweet berhasil dimuat ke staging_external_sentiment")
-                else:
-                    logger.error("❌ Gagal memuat data tweet ke database")
-            except Exception as e:
-                logger.error(f"Gagal memproses file tweet: {e}", exc_info=True)
+        started = time.perf_counter()
+        results = {}
+        if workers == 1 or len(sources) <= 1:
+            for label, path, table_name in sources:
+                results[label] = _timed_stage(path, table_name, mode)
         else:
-            logger.warning(f"File tweet tidak ditemukan: {tweet_file}")
+            max_workers = min(len(sources), workers or len(sources))
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(_timed_stage, path, table_name, mode): (label, table_name)
+                    for label, path, table_name in sources
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    label, table_name = futures[future]
+                    try:
+                        results[label] = future.result()
+                    except Exception as e:  # worker crashed
+                        results[label] = (False, time.perf_counter() - started, str(e), [])
         
-        # Proses file market share PDF
-        market_share_file = DATA_DIR / "market_share_report.pdf"
-        if market_share_file.exists():
-            try:
-                logger.info(f"Memproses file market share: {market_share_file}")
-                df_market_share, _ = process_market_share_pdf(market_share_file)
-                
-                # Load to database
-                if df_market_share is not None and load_to_database(df_market_share, "staging_market_share_report"):
-                    logger.info("✅ Data market share berhasil dimuat ke staging_market_share_report")
-                else:
-                    logger.error("❌ Gagal memuat data market share ke database")
-            except Exception as e:
-                logger.error(f"Gagal memproses file market share: {e}", exc_info=True)
-        else:
-            logger.warning(f"File market share tidak ditemukan: {market_share_file}")
+        # Laporan per sumber
+        tables = {label: table_name for label, _, table_name in sources}
+        for label, (ok, seconds, error, samples) in results.items():
+            load_metrics.record(samples)
+            if ok:
+                logger.info(f"✅ Data {label} berhasil dimuat ke {tables[label]} ({seconds:.2f} detik)")
+            else:
+                detail = f": {error}" if error else ""
+                logger.error(f"❌ Gagal memuat data {label} ke database ({seconds:.2f} detik){detail}")
+        
+        # Telemetri load per tabel (baris, byte, durasi, retry, round-trip) → log & file Prometheus
+        load_metrics.log_summary(logger.info)
+        try:
+            logger.info(f"Metrik load ditulis ke {load_metrics.write_metrics()}")
+        except OSError as e:
+            logger.warning(f"Gagal menulis file metrik: {e}")
         
-        logger.info("✅ Proses analisis data selesai")
+        total = time.perf_counter() - started
+        failed = [label for label, (ok, _, _, _) in results.items() if not ok]
+        if failed:
+            logger.error(f"Proses analisis selesai dengan {len(failed)} sumber gagal ({', '.join(failed)}) dalam {total:.2f} detik")
+        else:
+            logger.info(f"✅ Proses analisis data selesai dalam {total:.2f} detik")
+        return results
     
     except Exception as e:
         logger.error(f"Terjadi kesalahan dalam proses analisis: {e}", exc_info=True)
         raise
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyze raw sources and load them into the staging database")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parallel source processes (default: one per source, 1 = sequential)")
+    parser.add_argument("--mode", choices=('merge', 'append'), default=LOAD_MODE,
+                        help="merge = upsert on natural keys, append = plain COPY")
+    args = parser.parse_args()
+    main(workers=args.workers, mode=args.mode)
@@ -0,0 +1,265 @@
+# BENCHMARK: Ukur Throughput Ingestion dengan Korpus Sintetis (CSV, PDF, TXT)
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Rows generated per block when writing synthetic CSV/TXT files
+GENERATE_BLOCK_ROWS = 200_000
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+TWEET_WORDS = np.array([
+    'AdventureWorks', 'bike', 'helmet', 'ETL', 'warehouse', 'pipeline', 'great', 'slow',
+    'query', 'dashboard', 'touring', 'road', 'tire', 'sales', 'report', 'data', 'lake',
+])
+LOCATIONS = np.array(['Jakarta', 'Surabaya', 'Yogyakarta', 'Bandung', 'Singapore', 'Unknown'])
+SENTIMENTS = np.array(['positive', 'neutral', 'negative'])
+PRODUCTS = np.array(['Touring Bike', 'Road Tire', 'Helmet', 'Mountain Bike', 'Gloves'])
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like '512KB', '100MB' or '10GB' into bytes."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*', value.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    number, unit = match.groups()
+    if unit in ('K', 'M', 'G'):
+        unit += 'B'
+    return int(float(number) * SIZE_UNITS[unit])
+
+
+def _write_until(path: Path, target_bytes: int, make_block, header: str = None) -> int:
+    """Append generated text blocks to ``path`` until it reaches ``target_bytes``."""
+    written = 0
+    offset = 0
+    bytes_per_row = None
+    with path.open('w', encoding='utf-8', newline='') as f:
+        if header:
+            written += f.write(header)
+        while written < target_bytes:
+            if bytes_per_row is None:
+                rows = 1000  # small first block to measure the row width
+            else:
+                rows = int(min(GENERATE_BLOCK_ROWS, max(1, (target_bytes - written) // bytes_per_row + 1)))
+            n = f.write(make_block(offset, rows))
+            written += n
+            offset += rows
+            bytes_per_row = max(1, n // rows)
+    return written
+
+
+def generate_sensor_csv(path: Path, target_bytes: int, rng) -> int:
+    def block(offset, rows):
+        start = np.datetime64('2025-01-01T00:00:00') + np.timedelta64(offset, 'm')
+        df = pd.DataFrame({
+            'timestamp': start + np.arange(rows).astype('timedelta64[m]'),
+            'sensor_id': np.char.add('sensor_', rng.integers(1, 51, rows).astype(str)),
+            'temperature_c': np.round(rng.normal(28.0, 2.5, rows), 1),
+        })
+        return df.to_csv(index=False, header=False)
+    return _write_until(path, target_bytes, block, header='timestamp,sensor_id,temperature_c\n')
+
+
+def generate_tweets_txt(path: Path, target_bytes: int, rng) -> int:
+    def block(offset, rows):
+        words = TWEET_WORDS[rng.integers(0, len(TWEET_WORDS), (rows, 8))]
+        df = pd.DataFrame({
+            'tweet_id': np.arange(offset, offset + rows) + 1,
+            'tweet_text': [' '.join(w) + '.' for w in words],
+            'timestamp': np.datetime64('2024-06-01T00:00') + rng.integers(0, 43200, rows).astype('timedelta64[m]'),
+            'user_location': LOCATIONS[rng.integers(0, len(LOCATIONS), rows)],
+            'sentiment': SENTIMENTS[rng.integers(0, len(SENTIMENTS), rows)],
+            'matched_product': PRODUCTS[rng.integers(0, len(PRODUCTS), rows)],
+        })
+        return df.to_csv(sep='\t', index=False, header=False)
+    return _write_until(path, target_bytes, block)
+
+
+def generate_pdf(path: Path, pages: int, rng) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open() as doc:
+        for page_no in range(pages):
+            page = doc.new_page()
+            lines = [f"Market share report - page {page_no + 1}"]
+            for row in range(40):
+                lines.append(f"Competitor {rng.integers(1, 500)}  {rng.uniform(0, 30):.1f}%  period 2024-Q{row % 4 + 1}")
+            page.insert_text((36, 36), '\n'.join(lines), fontsize=8)
+        doc.save(path)
+    return path.stat().st_size
+
+
+def generate_corpus(workdir: Path, files: int, csv_bytes: int, txt_bytes: int, pdf_pages: int, seed: int) -> dict:
+    """Create ``files`` files of each kind under ``workdir/landing``."""
+    rng = np.random.default_rng(seed)
+    landing = workdir / "landing"
+    landing.mkdir(parents=True, exist_ok=True)
+    corpus = {'csv': [], 'txt': [], 'pdf': []}
+    for i in range(files):
+        csv_path = landing / f"warehouse_temp_sensor_{i:03d}.csv"
+        generate_sensor_csv(csv_path, csv_bytes // files, rng)
+        corpus['csv'].append(csv_path)
+
+        txt_path = landing / f"adventureworks_structured_{i:03d}_tweets.txt"
+        generate_tweets_txt(txt_path, txt_bytes // files, rng)
+        corpus['txt'].append(txt_path)
+
+        if pdf_pages:
+            pdf_path = landing / f"market_share_report_{i:03d}.pdf"
+            generate_pdf(pdf_path, max(1, pdf_pages // files), rng)
+            corpus['pdf'].append(pdf_path)
+    return corpus
+
+
+def peak_rss_mb() -> dict:
+    """Peak resident set size of this process and of reaped child processes."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return {'self': None, 'children': None}
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        'children': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def time_stage(name: str, paths, run) -> dict:
+    """Run ``run(path)`` for every path and return throughput figures."""
+    total_bytes = sum(p.stat().st_size for p in paths)
+    started = time.perf_counter()
+    ok = all(run(p) for p in paths) if paths else True
+    seconds = time.perf_counter() - started
+    print(f"  {name:<14} {len(paths)} file(s) in {seconds:.3f}s", file=sys.stderr)
+    return {
+        'ok': ok,
+        'files': len(paths),
+        'bytes': total_bytes,
+        'seconds': round(seconds, 4),
+        'mb_per_s': round(total_bytes / 1024 ** 2 / seconds, 2) if seconds else None,
+        'files_per_s': round(len(paths) / seconds, 2) if seconds else None,
+    }
+
+
+@contextlib.contextmanager
+def stdout_to_stderr():
+    """Send everything printed to stdout (including by worker processes) to stderr.
+
+    Keeps stdout free for the JSON report. fd 1 itself is redirected so
+    extraction worker processes inherit it too.
+    """
+    sys.stdout.flush()
+    saved = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def run_benchmark(workdir: Path, corpus: dict, workers: int) -> dict:
+    import ingest
+
+    out = workdir / "out"
+    out.mkdir(exist_ok=True)
+    all_files = corpus['csv'] + corpus['txt'] + corpus['pdf']
+    stages = {}
+    stages['copy'] = time_stage('copy', all_files, lambda p: ingest.copy_file(p, out / p.name))
+    stages['csv_text'] = time_stage('csv_text', corpus['csv'], lambda p: ingest.extract_csv_text(
+        p, out / f"{p.stem}_raw.txt"))
+    stages['csv_passthrough'] = time_stage('csv_passthrough', corpus['csv'], lambda p: ingest.extract_csv_text(
+        p, out / f"{p.stem}_pass.txt", passthrough=True))
+    stages['csv_parquet'] = time_stage('csv_parquet', corpus['csv'], lambda p: ingest.write_csv_parquet(
+        p, out / f"{p.stem}_parquet", partition_column='timestamp'))
+    stages['txt_text'] = time_stage('txt_text', corpus['txt'], lambda p: ingest.extract_txt_text(
+        p, out / f"{p.stem}_raw.txt"))
+    stages['pdf_text'] = time_stage('pdf_text', corpus['pdf'], lambda p: ingest.run_extraction_stage(
+        [(p, out / f"{p.stem}_raw.txt", 'pdf', {})], workers=workers)[out / f"{p.stem}_raw.txt"])
+    # Second pass over the same PDFs is served by the page cache
+    stages['pdf_text_cached'] = time_stage('pdf_text_cached', corpus['pdf'], lambda p: ingest.run_extraction_stage(
+        [(p, out / f"{p.stem}_raw2.txt", 'pdf', {})], workers=workers)[out / f"{p.stem}_raw2.txt"])
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest.py handlers on synthetic corpora")
+    parser.add_argument("--csv-size", type=parse_size, default=parse_size("64MB"), help="total sensor CSV size")
+    parser.add_argument("--txt-size", type=parse_size, default=parse_size("64MB"), help="total tweet TXT size")
+    parser.add_argument("--pdf-pages", type=int, default=200, help="total PDF pages (0 to skip PDFs)")
+    parser.add_argument("--files", type=int, default=2, help="files per kind; sizes are split evenly")
+    parser.add_argument("--workers", type=int, default=None, help="extraction worker processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=Path, default=None,
+                        help="scratch directory, never deleted (default: a temp dir removed afterwards)")
+    parser.add_argument("--keep", action="store_true", help="keep the temp dir with the generated corpus and outputs")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Only a directory created here is removed afterwards; a --workdir belongs to the user
+    created = args.workdir is None
+    workdir = Path(tempfile.mkdtemp(prefix="bench_ingest_")) if created else args.workdir
+    workdir.mkdir(parents=True, exist_ok=True)
+    # Keep the PDF page cache inside the scratch dir so runs start cold
+    os.environ['PDF_CACHE_DIR'] = str(workdir / "pdf_cache")
+
+    try:
+        print(f"Generating corpus in {workdir}...", file=sys.stderr)
+        started = time.perf_counter()
+        with stdout_to_stderr():
+            corpus = generate_corpus(workdir, args.files, args.csv_size, args.txt_size, args.pdf_pages, args.seed)
+        generate_seconds = time.perf_counter() - started
+
+        print("Running ingest stages...", file=sys.stderr)
+        started = time.perf_counter()
+        # ingest handlers print progress; keep it off stdout so the report stays valid JSON
+        with stdout_to_stderr():
+            stages = run_benchmark(workdir, corpus, args.workers)
+        total_seconds = time.perf_counter() - started
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': {
+                'csv_bytes': args.csv_size,
+                'txt_bytes': args.txt_size,
+                'pdf_pages': args.pdf_pages,
+                'files_per_kind': args.files,
+                'workers': args.workers,
+                'seed': args.seed,
+            },
+            'generate_seconds': round(generate_seconds, 3),
+            'total_seconds': round(total_seconds, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': stages,
+        }
+        text = json.dumps(report, indent=2)
+        if args.output:
+            args.output.write_text(text + '\n', encoding='utf-8')
+        else:
+            print(text)
+        return 0 if all(stage['ok'] for stage in stages.values()) else 1
+    finally:
+        if created and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# BULK LOAD: Muat DataFrame ke PostgreSQL dengan COPY FROM STDIN
+
+import csv
+import io
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+import load_metrics
+
+# Rows rendered to CSV per read from the COPY stream
+COPY_CHUNK_ROWS = 50_000
+# Bytes psycopg2 requests from the stream per read
+COPY_READ_SIZE = 1024 * 1024
+
+
+def postgres_type(dtype) -> str:
+    """Map a pandas dtype to the PostgreSQL column type used when creating a table."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return 'TIMESTAMPTZ'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    return 'TEXT'
+
+
+class DataFrameCSVStream(io.RawIOBase):
+    """Read-only byte stream that renders a DataFrame as CSV one chunk at a time.
+
+    COPY pulls from it with ``read(size)``, so at most one chunk of rendered
+    CSV is held in memory instead of the whole frame as text.
+    """
+
+    def __init__(self, df: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS):
+        self._df = df
+        self._chunk_rows = chunk_rows
+        self._offset = 0
+        self._buffer = b''
+        self._pos = 0
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _next_chunk(self) -> bytes:
+        if self._offset >= len(self._df):
+            return b''
+        chunk = self._df.iloc[self._offset:self._offset + self._chunk_rows]
+        self._offset += self._chunk_rows
+        text = chunk.to_csv(index=False, header=False, lineterminator='\n',
+                            quoting=csv.QUOTE_MINIMAL, date_format='%Y-%m-%d %H:%M:%S.%f')
+        data = text.encode('utf-8')
+        self.bytes_read += len(data)
+        return data
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [self._buffer[self._pos:]]
+            parts.extend(iter(self._next_chunk, b''))
+            self._buffer, self._pos = b'', 0
+            return b''.join(parts)
+        # Serve from the current chunk by position so reads never copy the remainder
+        while self._pos >= len(self._buffer):
+            self._buffer, self._pos = self._next_chunk(), 0
+            if not self._buffer:
+                return b''
+        data = self._buffer[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+
+def _qualified_name(conn, table_name: str, schema: str = None) -> str:
+    quote = conn.dialect.identifier_preparer.quote
+    return f"{quote(schema)}.{quote(table_name)}" if schema else quote(table_name)
+
+
+def create_table_sql(conn, df: pd.DataFrame, table_name: str, schema: str = None) -> str:
+    """CREATE TABLE IF NOT EXISTS statement with columns typed from the DataFrame dtypes."""
+    quote = conn.dialect.identifier_preparer.quote
+    columns = ',\n    '.join(f"{quote(str(col))} {postgres_type(dtype)}" for col, dtype in df.dtypes.items())
+    return f"CREATE TABLE IF NOT EXISTS {_qualified_name(conn, table_name, schema)} (\n    {columns}\n)"
+
+
+def _prepare_table(conn, df: pd.DataFrame, table_name: str, schema: str, if_exists: str) -> str:
+    """Apply ``if_exists`` and create the table from the dtypes if needed; return its quoted name."""
+    table = _qualified_name(conn, table_name, schema)
+    exists = inspect(conn).has_table(table_name, schema=schema)
+    if exists and if_exists == 'fail':
+        raise ValueError(f"Table {table} already exists")
+    if exists and if_exists == 'replace':
+        conn.execute(text(f"DROP TABLE {table}"))
+        exists = False
+    if not exists:
+        conn.execute(text(create_table_sql(conn, df, table_name, schema)))
+    return table
+
+
+def _copy_into(conn, table: str, df: pd.DataFrame, chunk_rows: int) -> None:
+    quote = conn.dialect.identifier_preparer.quote
+    columns = ', '.join(quote(str(col)) for col in df.columns)
+    copy_sql = f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    dbapi_conn = conn.connection.dbapi_connection
+    stream = DataFrameCSVStream(df, chunk_rows)
+    with dbapi_conn.cursor() as cursor:
+        cursor.copy_expert(copy_sql, stream, size=COPY_READ_SIZE)
+    # copy_expert bypasses SQLAlchemy's execute events, so report it to the metrics directly
+    load_metrics.add_round_trips()
+    load_metrics.add_bytes(stream.bytes_read)
+
+
+def _is_psycopg2(conn) -> bool:
+    return conn.dialect.name == 'postgresql' and conn.dialect.driver == 'psycopg2'
+
+
+def copy_dataframe(df: pd.DataFrame, table_name: str, conn, schema: str = None,
+                   if_exists: str = 'append', chunk_rows: int = COPY_CHUNK_ROWS, prepared: bool = False) -> int:
+    """Load ``df`` into ``table_name`` over an open SQLAlchemy connection.
+
+    On PostgreSQL with psycopg2 the rows are streamed with
+    ``COPY ... FROM STDIN (FORMAT csv)`` from a chunked in-memory CSV pipe.
+    A missing table is created from the DataFrame dtypes; ``if_exists``
+    follows ``DataFrame.to_sql`` ('append', 'replace' or 'fail'). Other
+    databases fall back to ``to_sql``. ``prepared`` skips the table check
+    when the caller already made sure the table exists in this load (e.g.
+    per chunk). The caller owns the transaction. Returns the number of rows
+    loaded.
+    """
+    if not _is_psycopg2(conn):
+        df.to_sql(table_name, con=conn, schema=schema, if_exists=if_exists,
+                  index=False, method='multi', chunksize=1000)
+        return len(df)
+
+    if prepared:
+        table = _qualified_name(conn, table_name, schema)
+    else:
+        table = _prepare_table(conn, df, table_name, schema, if_exists)
+    if df.empty:
+        return 0
+    _copy_into(conn, table, df, chunk_rows)
+    return len(df)
+
+
+def ensure_unique_key(conn, table_name: str, key_columns, schema: str = None) -> None:
+    """Create the unique index ``ON CONFLICT`` needs on ``key_columns`` if it is missing.
+
+    Tables filled by earlier append-only runs may already hold duplicate
+    keys; those are collapsed to one row per key first, or the index could
+    not be built.
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    table = _qualified_name(conn, table_name, schema)
+    inspector = inspect(conn)
+    unique_keys = [ix['column_names'] for ix in inspector.get_indexes(table_name, schema=schema) if ix['unique']]
+    unique_keys.append(inspector.get_pk_constraint(table_name, schema=schema).get('constrained_columns'))
+    if any(cols and sorted(cols) == sorted(key_columns) for cols in unique_keys):
+        return
+    index_name = f"{table_name}_{'_'.join(key_columns)}_key"[:63]
+    keys = ', '.join(quote(col) for col in key_columns)
+    # Keep the newest physical row per key; a window sort stays O(n log n) on large tables.
+    # tableoid is part of the row address because ctids repeat across partitions.
+    conn.execute(text(
+        f"DELETE FROM {table} WHERE (tableoid, ctid) IN ("
+        f"SELECT tableoid, ctid FROM (SELECT tableoid, ctid, row_number() OVER "
+        f"(PARTITION BY {keys} ORDER BY tableoid DESC, ctid DESC) AS rn FROM {table}) ranked WHERE rn > 1)"
+    ))
+    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {quote(index_name)} ON {table} ({keys})"))
+
+
+def upsert_dataframe(df: pd.DataFrame, table_name: str, conn, key_columns, schema: str = None,
+                     chunk_rows: int = COPY_CHUNK_ROWS, on_conflict: str = 'update', prepared: bool = False) -> int:
+    """Merge ``df`` into ``table_name`` on its natural key, so reloads do not duplicate rows.
+
+    Rows are COPYed into a temporary table shaped like the target, then
+    ``INSERT ... SELECT DISTINCT ON (keys) ... ON CONFLICT (keys) DO UPDATE``
+    inserts new keys and refreshes the other columns of existing ones (the
+    last row per key in ``df`` wins). With ``on_conflict='nothing'`` existing
+    keys are left untouched (insert-only dedup). ``prepared`` skips the
+    table and unique-key checks when the caller already ran them (with
+    ``ensure_unique_key``) in this load. Requires PostgreSQL with psycopg2.
+    The caller owns the transaction. Returns the number of rows inserted or
+    updated.
+    """
+    if not _is_psycopg2(conn):
+        raise RuntimeError(f"upsert_dataframe needs PostgreSQL via psycopg2, not {conn.dialect.name} ({conn.dialect.driver})")
+    if on_conflict not in ('update', 'nothing'):
+        raise ValueError(f"on_conflict must be 'update' or 'nothing', not {on_conflict!r}")
+    key_columns = list(key_columns)
+    missing = [col for col in key_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Key columns {missing} not in DataFrame for {table_name}")
+
+    if prepared:
+        table = _qualified_name(conn, table_name, schema)
+    else:
+        table = _prepare_table(conn, df, table_name, schema, 'append')
+        ensure_unique_key(conn, table_name, key_columns, schema)
+    if df.empty:
+        return 0
+
+    quote = conn.dialect.identifier_preparer.quote
+    temp = quote(f"_merge_{table_name}"[:63])
+    columns = [quote(str(col)) for col in df.columns]
+    keys = ', '.join(quote(col) for col in key_columns)
+    updates = ', '.join(f"{col} = EXCLUDED.{col}" for col in columns if col not in {quote(k) for k in key_columns})
+    action = f"DO UPDATE SET {updates}" if updates and on_conflict == 'update' else "DO NOTHING"
+
+    conn.execute(text(f"CREATE TEMP TABLE {temp} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    _copy_into(conn, temp, df, chunk_rows)
+    result = conn.execute(text(
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"SELECT DISTINCT ON ({keys}) {', '.join(columns)} FROM {temp} "
+        f"ORDER BY {keys}, ctid DESC "
+        f"ON CONFLICT ({keys}) {action}"
+    ))
+    conn.execute(text(f"DROP TABLE {temp}"))
+    return result.rowcount
@@ -2,6 +2,10 @@ import io
 import re
 from collections import Counter
 import numpy as np
+import pandas as pd
+from db import get_engine
+
+engine = get_engine('dwh')
 
 def get_sensor_data(days: int = 7):
     """Fetch sensor data for the specified number of days."""
@@ -0,0 +1,113 @@
+# DB: Registry Engine SQLAlchemy Bersama, Dikonfigurasi dari database.ini
+
+import configparser
+import os
+import threading
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+
+BASE_DIR = Path(__file__).parent
+# DATABASE_INI lets deployments and tests point at another config file
+CONFIG_PATH = Path(os.environ.get('DATABASE_INI', BASE_DIR / "database.ini"))
+
+_engines = {}
+_lock = threading.Lock()
+_config = None
+
+
+def load_config(path: Path = None) -> configparser.ConfigParser:
+    """Read database.ini (cached for the default path)."""
+    global _config
+    if path is None and _config is not None:
+        return _config
+    config = configparser.ConfigParser()
+    config_path = Path(path) if path else CONFIG_PATH
+    if not config.read(config_path, encoding='utf-8'):
+        raise FileNotFoundError(f"Konfigurasi database tidak ditemukan: {config_path}")
+    if path is None:
+        _config = config
+    return config
+
+
+def _section(name: str) -> configparser.SectionProxy:
+    config = load_config()
+    if not config.has_section(name):
+        raise KeyError(f"Bagian [{name}] tidak ada di {CONFIG_PATH}")
+    return config[name]
+
+
+def connection_params(name: str) -> dict:
+    """Plain connection keywords (host, port, user, password, dbname) for psycopg2."""
+    section = _section(name)
+    return {
+        'host': section.get('host'),
+        'port': section.get('port'),
+        'user': section.get('user'),
+        'password': section.get('password'),
+        'dbname': section.get('database'),
+    }
+
+
+def database_url(name: str) -> URL:
+    """SQLAlchemy URL for section ``name``; ``DB_<NAME>_URL`` overrides the file."""
+    override = os.environ.get(f"DB_{name.upper()}_URL")
+    if override:
+        return make_url(override)
+    params = connection_params(name)
+    return URL.create(
+        'postgresql+psycopg2',
+        username=params['user'],
+        password=params['password'] or None,
+        host=params['host'],
+        port=int(params['port']) if params['port'] else None,
+        database=params['dbname'],
+    )
+
+
+def get_engine(name: str = 'staging'):
+    """Return the shared, lazily created engine for section ``name``.
+
+    Every caller in this process gets the same engine, so connections come
+    from one pool (pre-pinged, recycled, with a server-side statement
+    timeout) instead of a fresh connect per load.
+    """
+    engine = _engines.get(name)
+    if engine is not None:
+        return engine
+    with _lock:
+        if name not in _engines:
+            section = _section(name)
+            connect_args = {'connect_timeout': section.getint('connect_timeout', fallback=10)}
+            statement_timeout = section.getint('statement_timeout_ms', fallback=0)
+            if statement_timeout:
+                connect_args['options'] = f"-c statement_timeout={statement_timeout}"
+            _engines[name] = create_engine(
+                database_url(name),
+                pool_size=section.getint('pool_size', fallback=5),
+                max_overflow=section.getint('max_overflow', fallback=10),
+                pool_timeout=section.getint('pool_timeout', fallback=30),
+                pool_recycle=section.getint('pool_recycle', fallback=1800),
+                pool_pre_ping=section.getboolean('pool_pre_ping', fallback=True),
+                connect_args=connect_args,
+            )
+        return _engines[name]
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection (e.g. at the end of a batch run)."""
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _after_fork_in_child() -> None:
+    # Pooled sockets belong to the parent; give the child fresh pools without closing them
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
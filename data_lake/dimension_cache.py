@@ -0,0 +1,100 @@
+# DIMENSION CACHE: Peta Natural Key → Surrogate Key Dimensi DWH, Dimuat Sekali per Run
+
+import threading
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+
+def _as_text(values) -> pd.Index:
+    return pd.Index(pd.Series(values).astype('string').str.strip())
+
+
+def _as_day(values) -> pd.Index:
+    return pd.DatetimeIndex(pd.to_datetime(pd.Series(values), errors='coerce')).normalize()
+
+
+def _as_hour(values) -> pd.Index:
+    return pd.DatetimeIndex(pd.to_datetime(pd.Series(values), errors='coerce')).floor('h')
+
+
+@dataclass(frozen=True)
+class DimensionSpec:
+    """``query`` returns (natural key, surrogate key); ``normalize`` puts keys and probes in one form."""
+    query: str
+    normalize: Callable = _as_text
+
+
+# Dimensi yang di-lookup oleh fact loader
+DIMENSIONS = {
+    'dim_time': DimensionSpec("SELECT timestamp, time_id FROM dwh.dim_time WHERE grain = 'day' ORDER BY timestamp", _as_day),
+    'dim_time_hour': DimensionSpec("SELECT timestamp, time_id FROM dwh.dim_time WHERE grain = 'hour' ORDER BY timestamp", _as_hour),
+    'dim_topic': DimensionSpec("SELECT keyword, topic_id FROM dwh.dim_topic"),
+    'dim_tweet': DimensionSpec("SELECT tweet_id, tweet_id FROM dwh.dim_tweet"),
+    'dim_competitor': DimensionSpec("SELECT competitor, competitor_id FROM dwh.dim_competitor"),
+    'dim_sensor': DimensionSpec("SELECT sensor_id, sensor_id FROM dwh.dim_sensor"),
+}
+
+
+class DimensionCache:
+    """Per-run cache of dimension key maps shared by every fact loader.
+
+    Each map is read from the warehouse once, on first use, and kept as a
+    hash index of natural keys plus an array of surrogate keys; lookups are
+    a single vectorized ``get_indexer`` over the whole column. Dimension
+    loaders call ``add`` after inserting, so the maps follow new rows
+    without re-reading the table. Safe to share between ETL threads.
+    """
+
+    def __init__(self, engine, specs: dict = None):
+        self._engine = engine
+        self._specs = specs or DIMENSIONS
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _load(self, name: str):
+        df = pd.read_sql(text(self._specs[name].query), con=self._engine)
+        return self._build(name, df.iloc[:, 0], df.iloc[:, 1].to_numpy())
+
+    def _build(self, name: str, natural_keys, surrogate_keys):
+        keys = self._specs[name].normalize(natural_keys)
+        # Kunci pertama menang jika natural key tidak unik (mis. beberapa jam pada tanggal yang sama)
+        first = ~keys.duplicated() & keys.notna()
+        return keys[first], np.asarray(surrogate_keys)[first]
+
+    def _map(self, name: str):
+        with self._lock:
+            if name not in self._maps:
+                self._maps[name] = self._load(name)
+            return self._maps[name]
+
+    def lookup(self, name: str, values: pd.Series) -> pd.Series:
+        """Surrogate key for every value (<NA> where the dimension has no such key)."""
+        keys, surrogates = self._map(name)
+        positions = keys.get_indexer(self._specs[name].normalize(values))
+        return pd.Series(pd.array(surrogates).take(positions, allow_fill=True), index=values.index)
+
+    def contains(self, name: str, values: pd.Series) -> np.ndarray:
+        keys, _ = self._map(name)
+        return keys.get_indexer(self._specs[name].normalize(values)) >= 0
+
+    def add(self, name: str, natural_keys, surrogate_keys) -> None:
+        """Record rows a dimension loader just inserted (ignored until the map is first loaded)."""
+        with self._lock:
+            if name not in self._maps:
+                return
+            keys, surrogates = self._maps[name]
+            new_keys, new_surrogates = self._build(name, natural_keys, surrogate_keys)
+            fresh = keys.get_indexer(new_keys) < 0
+            self._maps[name] = (keys.append(new_keys[fresh]), np.concatenate([surrogates, new_surrogates[fresh]]))
+
+    def clear(self, name: str = None) -> None:
+        """Forget one map (or all), e.g. at the start of a run."""
+        with self._lock:
+            if name is None:
+                self._maps.clear()
+            else:
+                self._maps.pop(name, None)
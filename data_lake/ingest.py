@@ -1,19 +1,181 @@
 # INGEST: Ambil & Simpan Data Mentah dari CSV, PDF, TXT (Pure Ingestion)
 
 import os
+import json
 import shutil
 import time
 import concurrent.futures
 from pathlib import Path
 from tqdm import tqdm
 import pandas as pd
-import fitz  # PyMuPDF
+from manifest import IngestManifest
+from source_registry import SourceRegistry
+import pdf_cache
+
+# Pages handed to one worker process per PDF task
+PDF_PAGES_PER_TASK = 8
+# Rows held in memory at once when streaming a CSV
+CSV_CHUNK_ROWS = 100_000
+# Bytes moved per kernel copy call / buffered read
+TRANSFER_BUFFER_SIZE = 8 * 1024 * 1024
+# Minimum seconds between progress bar refreshes during a transfer
+PROGRESS_INTERVAL = 0.5
+# Written last into a Parquet dataset directory once every part file is complete
+PARQUET_SUCCESS_MARKER = '_SUCCESS'
+# Artifacts are built under <name>.part and renamed into place when complete;
+# <name>.ckpt records how far an interrupted build got
+PARTIAL_SUFFIX = '.part'
+CHECKPOINT_SUFFIX = '.ckpt'
+
+class Checkpoint:
+    """Sidecar journal for an artifact being built under ``<artifact>.part``.
+
+    The journal is bound to the source's size and mtime. If the source has
+    changed or the partial output is gone, the saved state is discarded and
+    the artifact is rebuilt from scratch.
+    """
+
+    def __init__(self, src: Path, out_path: Path):
+        self.out_path = out_path
+        self.partial = out_path.with_name(out_path.name + PARTIAL_SUFFIX)
+        self.journal = out_path.with_name(out_path.name + CHECKPOINT_SUFFIX)
+        st = src.stat()
+        self.source = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        self.state = {}
+        try:
+            data = json.loads(self.journal.read_text(encoding='utf-8'))
+            if data.get('source') == self.source and self.partial.exists():
+                self.state = data.get('state', {})
+        except (FileNotFoundError, ValueError):
+            pass
+        if self.state:
+            print(f"Resuming {out_path.name} from checkpoint {self.state}")
+
+    def partial_size(self) -> int:
+        try:
+            return self.partial.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def save(self, **state) -> None:
+        self.state = state
+        tmp_path = self.journal.with_name(self.journal.name + '.tmp')
+        tmp_path.write_text(json.dumps({'source': self.source, 'state': state}), encoding='utf-8')
+        os.replace(tmp_path, self.journal)
+
+    def commit(self) -> None:
+        """Move the finished partial output into place and drop the journal."""
+        if self.out_path.is_dir():
+            shutil.rmtree(self.out_path)
+        os.replace(self.partial, self.out_path)
+        self.journal.unlink(missing_ok=True)
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write ``text`` to ``path`` via a partial file so readers never see a truncated file."""
+    partial = path.with_name(path.name + PARTIAL_SUFFIX)
+    partial.write_text(text, encoding='utf-8')
+    os.replace(partial, path)
+
+class _ThrottledProgress:
+    """Accumulate byte counts and push them to tqdm at most every PROGRESS_INTERVAL seconds.
+
+    ``on_flush`` is called with the absolute position after each refresh,
+    which transfer_file uses to checkpoint its offset.
+    """
+
+    def __init__(self, pbar, position: int = 0, on_flush=None):
+        self.pbar = pbar
+        self.position = position
+        self.on_flush = on_flush
+        self.pending = 0
+        self.last = time.monotonic()
+
+    def update(self, n: int) -> None:
+        self.pending += n
+        self.position += n
+        now = time.monotonic()
+        if now - self.last >= PROGRESS_INTERVAL:
+            self.flush()
+            self.last = now
+
+    def flush(self) -> None:
+        if self.pending:
+            self.pbar.update(self.pending)
+            self.pending = 0
+            if self.on_flush is not None:
+                self.on_flush(self.position)
+
+def _kernel_copy(in_fd: int, out_fd: int, start: int, total: int, progress: _ThrottledProgress) -> int:
+    """Copy up to ``total`` bytes from offset ``start`` with copy_file_range/sendfile; return bytes copied.
+
+    Both descriptors must already be positioned at ``start``.
+    """
+    for name in ('copy_file_range', 'sendfile'):
+        primitive = getattr(os, name, None)
+        if primitive is None:
+            continue
+        copied = 0
+        try:
+            while copied < total:
+                count = min(TRANSFER_BUFFER_SIZE, total - copied)
+                if name == 'copy_file_range':
+                    n = primitive(in_fd, out_fd, count)
+                else:
+                    n = primitive(out_fd, in_fd, start + copied, count)
+                if n == 0:
+                    break
+                copied += n
+                progress.update(n)
+            return copied
+        except OSError:
+            # Unsupported for this pair of files (e.g. cross-device, non-Linux);
+            # hand whatever is left to the next primitive or the buffered copy
+            if copied:
+                return copied
+    return 0
+
+def transfer_file(src: Path, dst: Path, desc: str = None) -> int:
+    """Copy ``src`` to ``dst`` byte for byte without any transformation.
+
+    Uses the kernel's copy primitives where available and falls back to a
+    large-buffer read/write loop. Progress is shown only when ``desc`` is
+    given and is refreshed by time, not per chunk. Bytes go to ``dst.part``
+    and are renamed into place at the end; an interrupted transfer resumes
+    from its checkpointed offset. Returns the size of ``dst``.
+    """
+    total = src.stat().st_size
+    checkpoint = Checkpoint(src, dst)
+    offset = min(checkpoint.state.get('offset', 0), checkpoint.partial_size())
+    with src.open('rb') as fsrc, checkpoint.partial.open('r+b' if offset else 'wb') as fdst, \
+         tqdm(total=total, initial=offset, desc=desc, unit="B", unit_scale=True, disable=desc is None) as pbar:
+        fdst.truncate(offset)
+        fsrc.seek(offset)
+        fdst.seek(offset)
+        progress = _ThrottledProgress(pbar, position=offset, on_flush=lambda pos: checkpoint.save(offset=pos))
+        copied = offset + _kernel_copy(fsrc.fileno(), fdst.fileno(), offset, total - offset, progress)
+        if copied < total:
+            fsrc.seek(copied)
+            fdst.seek(copied)
+            buf = bytearray(TRANSFER_BUFFER_SIZE)
+            view = memoryview(buf)
+            while True:
+                n = fsrc.readinto(buf)
+                if not n:
+                    break
+                fdst.write(view[:n])
+                copied += n
+                progress.update(n)
+        progress.on_flush = None
+        progress.flush()
+    checkpoint.commit()
+    return copied
 
 def copy_file(src: Path, dst: Path) -> bool:
     """Copy file with error handling and progress tracking."""
     try:
         dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
+        transfer_file(src, dst)
+        shutil.copystat(src, dst)
         return True
     except Exception as e:
         print(f"Error copying {src}: {e}")
@@ -22,23 +184,157 @@ def copy_file(src: Path, dst: Path) -> bool:
 def extract_pdf_text(pdf_path: Path, txt_path: Path) -> bool:
     """Extract text from PDF and save to text file."""
     try:
-        text_parts = []
-        with fitz.open(pdf_path) as doc:
-            for page in tqdm(doc, desc="Extracting PDF pages", unit="page"):
-                text_parts.append(page.get_text())
+        # Pages already parsed by any stage come straight from the page cache,
+        # so an interrupted extraction resumes at the first uncached page
+        text_parts = pdf_cache.page_texts(pdf_path)
         
-        txt_path.write_text('\n'.join(text_parts), encoding='utf-8')
+        write_text_atomic(txt_path, '\n'.join(text_parts))
         return True
     except Exception as e:
         print(f"Error processing PDF {pdf_path}: {e}")
         return False
 
-def extract_csv_text(csv_path: Path, txt_path: Path) -> bool:
-    """Extract text from CSV and save to text file with progress bar."""
+def _extract_pdf_page_range(pdf_path: Path, start: int, stop: int, key: str) -> list:
+    """Extract the text of pages [start, stop) of a PDF (runs in a worker process)."""
+    return pdf_cache.page_texts(pdf_path, start, stop, key=key)
+
+def extract_with_handler(handler: str, path: Path, out_path: Path, options: dict = None) -> bool:
+    """Run the whole-file extractor registered for ``handler``."""
+    if handler == 'pdf':
+        return extract_pdf_text(path, out_path)
+    if handler == 'csv':
+        return extract_csv_text(path, out_path)
+    if handler == 'txt':
+        return extract_txt_text(path, out_path)
+    if handler == 'parquet':
+        return write_csv_parquet(path, out_path, **(options or {}))
+    return True
+
+def raw_outputs(dst: Path, rule) -> list:
+    """Return the raw-zone jobs for an ingested copy as (out_path, handler, options, artifact).
+
+    ``artifact`` is the file the manifest tracks for that output: the text
+    dump itself, or the ``_SUCCESS`` marker of a Parquet dataset.
+    """
+    outputs = []
+    if rule.raw_format in ('text', 'both'):
+        txt_path = dst.parent / f"{dst.stem}_raw.txt"
+        outputs.append((txt_path, rule.handler, {}, txt_path))
+    if rule.raw_format in ('parquet', 'both'):
+        dataset_dir = dst.parent / f"{dst.stem}_parquet"
+        options = {'partition_column': rule.partition_column}
+        outputs.append((dataset_dir, 'parquet', options, dataset_dir / PARQUET_SUCCESS_MARKER))
+    return outputs
+
+def run_extraction_stage(jobs, workers: int = None) -> dict:
+    """Build raw-zone outputs for every (path, out_path, handler, options) job using a process pool.
+
+    PDFs are split into page ranges of ``PDF_PAGES_PER_TASK`` pages that are
+    extracted in parallel and reassembled in page order; CSV, TXT and Parquet
+    jobs are one task each. With ``workers == 1`` everything runs in-process.
+    Returns a mapping of out_path -> success flag.
+    """
+    results = {}
+    if not jobs:
+        return results
+    if workers == 1:
+        for path, out_path, handler, options in jobs:
+            results[out_path] = extract_with_handler(handler, path, out_path, options)
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        # Submit everything first so PDF pages and other files overlap
+        for path, txt_path, handler, options in jobs:
+            if handler == 'pdf':
+                try:
+                    key = pdf_cache.document_key(path)
+                    page_count = pdf_cache.page_count(path, key)
+                except Exception as e:
+                    print(f"Error processing PDF {path}: {e}")
+                    results[txt_path] = False
+                    continue
+                futures = [
+                    pool.submit(_extract_pdf_page_range, path, start, min(start + PDF_PAGES_PER_TASK, page_count), key)
+                    for start in range(0, page_count, PDF_PAGES_PER_TASK)
+                ]
+                pending.append((path, txt_path, futures, page_count))
+            else:
+                pending.append((path, txt_path, [pool.submit(extract_with_handler, handler, path, txt_path, options)], None))
+
+        for path, txt_path, futures, page_count in pending:
+            try:
+                if page_count is None:
+                    results[txt_path] = futures[0].result()
+                    continue
+                text_parts = []
+                with tqdm(total=page_count, desc=f"Extracting {path.name}", unit="page") as pbar:
+                    for future in futures:  # submission order == page order
+                        pages = future.result()
+                        text_parts.extend(pages)
+                        pbar.update(len(pages))
+                write_text_atomic(txt_path, '\n'.join(text_parts))
+                results[txt_path] = True
+            except Exception as e:
+                print(f"Error processing {path}: {e}")
+                results[txt_path] = False
+    return results
+
+def _resume_chunks(chunks, rows_done: int):
+    """Drop the first ``rows_done`` rows of a chunk iterator (already written before a restart).
+
+    Rows are skipped after parsing rather than with ``skiprows`` so quoted
+    fields containing newlines cannot shift the resume point.
+    """
+    for chunk in chunks:
+        if rows_done >= len(chunk):
+            rows_done -= len(chunk)
+            continue
+        if rows_done:
+            chunk = chunk.iloc[rows_done:].copy()
+            rows_done = 0
+        yield chunk
+
+def extract_csv_text(csv_path: Path, txt_path: Path, streaming: bool = True,
+                     passthrough: bool = False, chunk_size: int = CSV_CHUNK_ROWS) -> bool:
+    """Extract text from CSV and save to text file with progress bar.
+
+    By default the CSV is re-serialized chunk by chunk straight into the
+    output file, so memory stays bounded by ``chunk_size`` rows. With
+    ``passthrough=True`` the file is copied byte for byte without parsing,
+    for CSVs that need no normalization. ``streaming=False`` keeps the old
+    read-everything-then-write behaviour. Streaming output is checkpointed
+    after every chunk and resumes from the last completed chunk.
+    """
     try:
         print(f"\nProcessing CSV {csv_path.name}...")
+        if passthrough:
+            transfer_file(csv_path, txt_path, desc="Copying CSV file")
+            return True
+        
+        if streaming:
+            checkpoint = Checkpoint(csv_path, txt_path)
+            rows_done = checkpoint.state.get('rows', 0)
+            bytes_done = checkpoint.state.get('bytes', 0)
+            if bytes_done > checkpoint.partial_size():
+                rows_done = bytes_done = 0
+            if rows_done:
+                os.truncate(checkpoint.partial, bytes_done)
+            with checkpoint.partial.open('a' if rows_done else 'w', encoding='utf-8', newline='') as f, \
+                 tqdm(desc="Streaming CSV chunks", unit="rows", initial=rows_done) as pbar:
+                header = not rows_done
+                chunks = pd.read_csv(csv_path, chunksize=chunk_size)
+                for chunk in _resume_chunks(chunks, rows_done):
+                    chunk.to_csv(f, index=False, header=header)
+                    header = False
+                    f.flush()
+                    rows_done += len(chunk)
+                    checkpoint.save(rows=rows_done, bytes=checkpoint.partial_size())
+                    pbar.update(len(chunk))
+            checkpoint.commit()
+            return True
+        
         # Read CSV in chunks with progress bar
-        chunk_size = 1000  # Process 1000 rows at a time
         chunks = []
         with tqdm(desc="Reading CSV chunks", unit="rows") as pbar:
             for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
@@ -52,90 +348,185 @@ def extract_csv_text(csv_path: Path, txt_path: Path) -> bool:
         text = df.to_csv(index=False)
         
         # Write with progress bar
+        partial = txt_path.with_name(txt_path.name + PARTIAL_SUFFIX)
         with tqdm(total=len(text), desc="Writing CSV text", unit="chars") as pbar:
-            with txt_path.open('w', encoding='utf-8') as f:
+            with partial.open('w', encoding='utf-8') as f:
                 for i in range(0, len(text), 10000):  # Write in chunks of 10000 chars
                     f.write(text[i:i+10000])
                     pbar.update(10000)
+        os.replace(partial, txt_path)
         
         return True
     except Exception as e:
         print(f"Error processing CSV {csv_path}: {e}")
         return False
 
+def write_csv_parquet(csv_path: Path, dataset_dir: Path, partition_column: str = None,
+                      chunk_size: int = CSV_CHUNK_ROWS, compression: str = 'zstd') -> bool:
+    """Write a CSV as a typed, compressed Parquet dataset.
+
+    The CSV is streamed in ``chunk_size`` rows; the schema of the first chunk
+    is enforced on the rest. Integer columns are widened to float64 first,
+    since a later chunk may hold decimals or blanks in the same column. When
+    ``partition_column`` is given it is parsed as a timestamp and rows are
+    written to Hive-style ``date=YYYY-MM-DD`` directories so readers can
+    prune by day. The dataset is built in
+    ``<dataset_dir>.part``, checkpointed after every chunk, and swapped in
+    with a _SUCCESS marker when complete.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Error: pyarrow is required for Parquet output (pip install pyarrow)")
+        return False
+
+    try:
+        print(f"\nWriting Parquet dataset for {csv_path.name}...")
+        checkpoint = Checkpoint(csv_path, dataset_dir)
+        tmp_dir = checkpoint.partial
+        rows_done = checkpoint.state.get('rows', 0)
+        part = checkpoint.state.get('parts', 0)
+        schema = None
+        if rows_done:
+            # Drop part files of the chunk that was in flight when the run died
+            for path in tmp_dir.rglob('part-*.parquet'):
+                if int(path.stem.split('-')[1]) >= part:
+                    path.unlink()
+            existing = sorted(tmp_dir.rglob('part-*.parquet'))
+            if existing:
+                schema = pq.read_schema(existing[0])
+        else:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+
+        with tqdm(desc="Writing Parquet chunks", unit="rows", initial=rows_done) as pbar:
+            chunks = pd.read_csv(csv_path, chunksize=chunk_size)
+            for chunk in _resume_chunks(chunks, rows_done):
+                if partition_column:
+                    chunk[partition_column] = pd.to_datetime(chunk[partition_column], errors='coerce')
+                integers = chunk.select_dtypes(include='integer').columns
+                if len(integers):
+                    chunk[integers] = chunk[integers].astype('float64')
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if schema is None:
+                    schema = table.schema
+
+                if partition_column:
+                    days = chunk[partition_column].dt.strftime('%Y-%m-%d').fillna('__unknown__')
+                    for day, index in chunk.groupby(days, sort=False).indices.items():
+                        out_dir = tmp_dir / f"date={day}"
+                        out_dir.mkdir(exist_ok=True)
+                        pq.write_table(table.take(index), out_dir / f"part-{part:05d}.parquet",
+                                       compression=compression)
+                else:
+                    pq.write_table(table, tmp_dir / f"part-{part:05d}.parquet", compression=compression)
+                part += 1
+                rows_done += len(chunk)
+                checkpoint.save(rows=rows_done, parts=part)
+                pbar.update(len(chunk))
+
+        (tmp_dir / PARQUET_SUCCESS_MARKER).touch()
+        checkpoint.commit()
+        return True
+    except Exception as e:
+        print(f"Error writing Parquet for {csv_path}: {e}")
+        return False
+
+def read_parquet_dataset(dataset_dir: Path, columns=None, start=None, end=None) -> pd.DataFrame:
+    """Read a dataset written by write_csv_parquet, touching only the needed files.
+
+    ``columns`` limits the columns decoded; ``start``/``end`` (dates, inclusive)
+    prune ``date=`` partitions by directory name before any file is opened.
+    """
+    import pyarrow.parquet as pq
+
+    start = pd.Timestamp(start).strftime('%Y-%m-%d') if start is not None else None
+    end = pd.Timestamp(end).strftime('%Y-%m-%d') if end is not None else None
+    files = []
+    for path in sorted(Path(dataset_dir).rglob('*.parquet')):
+        day = path.parent.name.partition('date=')[2]
+        if day and day != '__unknown__':
+            if (start and day < start) or (end and day > end):
+                continue
+        files.append(path)
+    if not files:
+        return pd.DataFrame(columns=columns)
+    return pd.concat((pq.read_table(f, columns=columns).to_pandas() for f in files), ignore_index=True)
+
 def extract_txt_text(txt_path: Path, txt_path_out: Path) -> bool:
     """Copy TXT file to new location with _raw suffix and progress bar."""
     try:
         print(f"\nProcessing TXT {txt_path.name}...")
         
-        # Read file size
-        file_size = txt_path.stat().st_size
-        
-        # Read and write with progress bar
-        with txt_path.open('r', encoding='utf-8') as src, \
-             txt_path_out.open('w', encoding='utf-8') as dst, \
-             tqdm(total=file_size, desc="Copying TXT file", unit="B", unit_scale=True) as pbar:
-            
-            chunk_size = 1024  # 1KB chunks
-            while True:
-                chunk = src.read(chunk_size)
-                if not chunk:
-                    break
-                dst.write(chunk)
-                pbar.update(len(chunk))
+        # The raw copy needs no transformation, so move bytes directly
+        transfer_file(txt_path, txt_path_out, desc="Copying TXT file")
         
         return True
     except Exception as e:
         print(f"Error processing TXT {txt_path}: {e}")
         return False
 
-def main():
+def main(force: bool = False, workers: int = None):
     start_time = time.time()
     print(" Starting data ingestion process...")
     
     # Get the data_lake directory path
     DATA_LAKE_DIR = Path(__file__).parent  # This file is in data_lake directory
     
-    # Define source and destination paths relative to DATA_LAKE_DIR
-    operations = [
-        # (source, destination, is_pdf)
-        ("data_lake/data_lake/adventureworks/organized/warehouse_temp_sensor.csv", "adventureworks/organized/warehouse_temp_sensor.csv", False),
-        ("data_lake/data_lake/adventureworks/organized/market_share_report.pdf", "adventureworks/organized/market_share_report.pdf", True),
-        ("data_lake/data_lake/adventureworks/organized/adventureworks_structured_150_tweets.txt", "adventureworks/organized/adventureworks_structured_150_tweets.txt", False),
-    ]
+    # Manifest of previously ingested sources; unchanged sources are skipped
+    manifest = IngestManifest(DATA_LAKE_DIR / "adventureworks" / "ingest_manifest.json")
+    
+    # Discover landing files once; sources.json maps each glob to a handler and destination
+    registry = SourceRegistry.from_file(DATA_LAKE_DIR / "sources.json")
+    discovered = registry.scan()
+    if not discovered:
+        print(f"Warning: No registered source files found in {registry.landing_dir}")
     
     # Process files in parallel
     with concurrent.futures.ThreadPoolExecutor() as executor:
         futures = []
-        for src_rel, dst_rel, is_pdf in operations:
-            src = DATA_LAKE_DIR.parent / src_rel  # Go up one level to account for the nested data_lake directory
-            dst = DATA_LAKE_DIR / dst_rel
+        skipped = 0
+        for src, rule in discovered:
+            dst = registry.resolve(rule.destination) / src.name
             
-            # Ensure source file exists
-            if not src.exists():
-                print(f"Warning: Source file not found: {src}")
+            # Raw-zone outputs (text dump and/or Parquet) live next to the copy
+            outputs = raw_outputs(dst, rule)
+            artifacts = [dst] + [artifact for _, _, _, artifact in outputs]
+            if not force and not manifest.needs_ingest(src, artifacts):
+                skipped += 1
                 continue
                 
             # Submit copy operation
             future = executor.submit(copy_file, src, dst)
-            futures.append((future, dst, is_pdf))
+            futures.append((future, src, dst, outputs, artifacts))
         
-        # Process results and handle file extraction
-        for future, dst, is_pdf in futures:
-            if not future.result():
-                continue
-            
-            # Create raw text version in the same directory
-            txt_path = dst.parent / f"{dst.stem}_raw.txt"
-            if dst.suffix.lower() == '.pdf':
-                extract_pdf_text(dst, txt_path)
-            elif dst.suffix.lower() == '.csv':
-                extract_csv_text(dst, txt_path)
-            elif dst.suffix.lower() == '.txt':
-                extract_txt_text(dst, txt_path)
+        # Collect finished copies for the extraction stage
+        jobs = []
+        for future, src, dst, outputs, artifacts in futures:
+            if future.result():
+                jobs.extend((dst, out_path, handler, options) for out_path, handler, options, _ in outputs)
+    
+    # Extract raw outputs in a process pool (PDFs fan out page by page)
+    results = run_extraction_stage(jobs, workers=workers)
+    for future, src, dst, outputs, artifacts in futures:
+        if outputs and all(results.get(out_path) for out_path, _, _, _ in outputs):
+            manifest.record(src, artifacts)
+    
+    manifest.save()
     
     total_time = time.time() - start_time
+    if skipped:
+        print(f"\n {skipped} file tidak berubah sejak ingestion terakhir, dilewati")
     print(f"\n Semua file berhasil diproses dalam {total_time:.2f} detik")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest raw CSV/PDF/TXT files into the data lake")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="extraction worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--force", action="store_true", help="re-ingest even unchanged sources")
+    args = parser.parse_args()
+    main(force=args.force, workers=args.workers)
@@ -0,0 +1,279 @@
+# INGEST DAEMON: Pantau Landing Directory & Proses File Baru Secara Otomatis
+
+import argparse
+import asyncio
+import concurrent.futures
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+
+from ingest import copy_file, extract_with_handler, raw_outputs
+from manifest import IngestManifest
+from source_registry import SourceRegistry
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+_INOTIFY_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# Batas jeda percobaan ulang file yang gagal diproses (jeda awal: retry_delay, lalu dobel)
+RETRY_MAX_DELAY = 600.0
+
+
+class InotifyWatcher:
+    """Minimal ctypes binding to Linux inotify for a single directory."""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        self.directory = directory
+
+    def read_events(self):
+        """Return (names, overflowed) for all queued events."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+        names, overflowed, offset = [], False, 0
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            raw_name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+            elif raw_name:
+                names.append(os.fsdecode(raw_name))
+        return names, overflowed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class IngestDaemon:
+    """Watch the landing directory and push each settled file through copy → extract → stage.
+
+    Files are considered complete once their size and mtime have not changed
+    for ``settle_seconds``. At most ``max_concurrency`` files are in flight;
+    extraction runs in a process pool and copy/stage calls in a thread pool.
+    A file that fails (copy, extraction or staging) is not recorded in the
+    manifest and is queued again after ``retry_delay`` seconds, doubling per
+    consecutive failure up to RETRY_MAX_DELAY; this works with inotify too,
+    where the directory is not rescanned.
+    """
+
+    def __init__(self, registry: SourceRegistry, manifest: IngestManifest, max_concurrency: int = 4,
+                 settle_seconds: float = 2.0, poll_interval: float = 2.0, stage: bool = True,
+                 use_inotify: bool = True, retry_delay: float = 5.0):
+        self.registry = registry
+        self.manifest = manifest
+        self.max_concurrency = max_concurrency
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.stage = stage
+        self.use_inotify = use_inotify and sys.platform.startswith('linux')
+        self.retry_delay = retry_delay
+        self._pending = {}     # path -> ((size, mtime_ns), last change time)
+        self._failures = {}    # path -> (consecutive failures, loop time of the next attempt)
+        self._in_flight = set()
+        self._tasks = set()
+
+    def _notice(self, path: Path, retry: bool = False) -> None:
+        """Register a (possibly still growing) file for debouncing; ``retry`` marks a scheduled retry."""
+        if path in self._in_flight or self.registry.match(path.name) is None:
+            return
+        if not retry and path in self._failures and self._loop.time() < self._failures[path][1]:
+            return  # masih dalam jeda percobaan ulang (mis. scan polling)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._pending.pop(path, None)
+            return
+        signature = (st.st_size, st.st_mtime_ns)
+        previous = self._pending.get(path)
+        if previous is None or previous[0] != signature:
+            self._pending[path] = (signature, self._loop.time())
+
+    def _rescan(self) -> None:
+        for path, _ in self.registry.scan():
+            self._notice(path)
+
+    def _on_inotify(self, watcher: InotifyWatcher) -> None:
+        names, overflowed = watcher.read_events()
+        if overflowed:
+            logger.warning("Antrian inotify penuh, melakukan scan ulang direktori")
+            self._rescan()
+        for name in names:
+            self._notice(self.registry.landing_dir / name)
+
+    async def _poll(self) -> None:
+        while True:
+            self._rescan()
+            await asyncio.sleep(self.poll_interval)
+
+    async def _settle(self) -> None:
+        """Dispatch files whose size and mtime stayed unchanged for settle_seconds."""
+        while True:
+            await asyncio.sleep(min(self.settle_seconds, 1.0) / 2)
+            now = self._loop.time()
+            for path, (signature, changed_at) in list(self._pending.items()):
+                if now - changed_at < self.settle_seconds:
+                    continue
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    del self._pending[path]
+                    continue
+                if (st.st_size, st.st_mtime_ns) != signature:
+                    self._pending[path] = ((st.st_size, st.st_mtime_ns), now)
+                    continue
+                del self._pending[path]
+                self._in_flight.add(path)
+                task = asyncio.create_task(self._process(path))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, src: Path) -> None:
+        rule = self.registry.match(src.name)
+        dst = self.registry.resolve(rule.destination) / src.name
+        outputs = raw_outputs(dst, rule)
+        artifacts = [dst] + [artifact for _, _, _, artifact in outputs]
+        done = False
+        try:
+            async with self._semaphore:
+                if not self.manifest.needs_ingest(src, artifacts):
+                    done = True
+                    return
+                started = self._loop.time()
+                if not await self._loop.run_in_executor(self._threads, copy_file, src, dst):
+                    return
+                extracted = await asyncio.gather(*(
+                    self._loop.run_in_executor(self._processes, extract_with_handler, handler, dst, out_path, options)
+                    for out_path, handler, options, _ in outputs
+                ))
+                if not all(extracted):
+                    return
+
+                staged = None
+                if self.stage and rule.staging_table:
+                    staged = await self._loop.run_in_executor(self._threads, self._stage, dst, rule.staging_table)
+                elapsed = self._loop.time() - started
+                if staged is False:
+                    # Tidak dicatat di manifest; dijadwalkan ulang di blok finally
+                    logger.warning(f"⚠️ {src.name} gagal dimuat ke staging setelah {elapsed:.2f} detik")
+                    return
+                self.manifest.record(src, artifacts)
+                self.manifest.save()
+                done = True
+                status = "" if staged is None else " & dimuat ke staging"
+                logger.info(f"✅ {src.name} diproses{status} dalam {elapsed:.2f} detik")
+        except asyncio.CancelledError:
+            done = True  # daemon berhenti; file diambil lagi saat start berikutnya
+            raise
+        except Exception as e:
+            logger.error(f"Gagal memproses {src}: {e}", exc_info=True)
+        finally:
+            self._in_flight.discard(src)
+            if done:
+                self._failures.pop(src, None)
+            else:
+                self._retry_later(src)
+
+    def _retry_later(self, src: Path) -> None:
+        """Queue ``src`` again after an exponential backoff (it stays out of the manifest until it succeeds)."""
+        failures = self._failures.get(src, (0, 0.0))[0] + 1
+        delay = min(self.retry_delay * 2 ** (failures - 1), RETRY_MAX_DELAY)
+        self._failures[src] = (failures, self._loop.time() + delay)
+        logger.warning(f"🔁 {src.name} akan dicoba lagi dalam {delay:g} detik (gagal {failures}x berturut-turut)")
+        self._loop.call_later(delay, self._notice, src, True)
+
+    @staticmethod
+    def _stage(path: Path, table_name: str) -> bool:
+        # Imported lazily so the daemon can run without database drivers when stage=False
+        from analysis import stage_file
+        return stage_file(path, table_name)
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.registry.landing_dir.mkdir(parents=True, exist_ok=True)
+
+        watcher = None
+        if self.use_inotify:
+            try:
+                watcher = InotifyWatcher(self.registry.landing_dir)
+                self._loop.add_reader(watcher.fd, self._on_inotify, watcher)
+                logger.info(f"Memantau {self.registry.landing_dir} dengan inotify")
+            except (OSError, AttributeError, NotImplementedError) as e:
+                logger.warning(f"inotify tidak tersedia ({e}), beralih ke polling")
+                watcher = None
+        if watcher is None:
+            logger.info(f"Memantau {self.registry.landing_dir} dengan polling setiap {self.poll_interval} detik")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrency) as threads, \
+             concurrent.futures.ProcessPoolExecutor(max_workers=self.max_concurrency) as processes:
+            self._threads = threads
+            self._processes = processes
+            # Pick up files that landed while the daemon was not running
+            self._rescan()
+            background = [asyncio.create_task(self._settle())]
+            if watcher is None:
+                background.append(asyncio.create_task(self._poll()))
+            try:
+                await asyncio.gather(*background)
+            finally:
+                for task in background + list(self._tasks):
+                    task.cancel()
+                if watcher is not None:
+                    self._loop.remove_reader(watcher.fd)
+                    watcher.close()
+                self.manifest.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running ingestion service for the landing directory")
+    parser.add_argument("--concurrency", type=int, default=4, help="files processed at the same time")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="seconds a file must stay unchanged before it is ingested")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="polling interval when inotify is unavailable")
+    parser.add_argument("--poll", action="store_true", help="force polling instead of inotify")
+    parser.add_argument("--no-stage", action="store_true", help="only copy and extract, do not load staging")
+    parser.add_argument("--retry-delay", type=float, default=5.0,
+                        help="seconds before a failed file is retried (doubles per consecutive failure)")
+    args = parser.parse_args()
+
+    daemon = IngestDaemon(
+        SourceRegistry.from_file(BASE_DIR / "sources.json"),
+        IngestManifest(BASE_DIR / "adventureworks" / "ingest_manifest.json"),
+        max_concurrency=args.concurrency,
+        settle_seconds=args.settle,
+        poll_interval=args.poll_interval,
+        stage=not args.no_stage,
+        use_inotify=not args.poll,
+        retry_delay=args.retry_delay,
+    )
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        logger.info("Daemon ingestion dihentikan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# LOAD METRICS: Telemetri Load Staging (baris, byte, durasi, retry, round-trip) per Tabel & Chunk
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+# Prometheus text format; arahkan node_exporter --collector.textfile.directory ke foldernya
+METRICS_PATH = Path(os.environ.get('STAGING_METRICS_FILE', BASE_DIR / "metrics" / "staging_load.prom"))
+# Batas bucket histogram durasi per chunk (detik)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_samples = []
+_lock = threading.Lock()
+_current = contextvars.ContextVar('load_sample', default=None)
+
+
+@dataclass
+class LoadSample:
+    """Measurements of one load unit (a chunk, or a whole frame when ``chunk`` is None)."""
+    table: str
+    chunk: Optional[int] = None
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    retries: int = 0
+    round_trips: int = 0
+    ok: bool = True
+
+
+@contextmanager
+def measure(table: str, chunk: int = None):
+    """Time a load of ``table`` and collect what happens inside the block.
+
+    Statements executed through any SQLAlchemy engine while the block is
+    active count as round-trips; COPY bytes are added by bulk_load. The
+    caller sets ``rows`` (and ``retries``) on the yielded sample.
+    """
+    sample = LoadSample(table, chunk)
+    token = _current.set(sample)
+    started = time.perf_counter()
+    try:
+        yield sample
+    except BaseException:
+        sample.ok = False
+        raise
+    finally:
+        sample.seconds = time.perf_counter() - started
+        _current.reset(token)
+        with _lock:
+            _samples.append(sample)
+        logger.debug(f"{table}[{chunk}]: {sample.rows} baris, {sample.bytes} byte, "
+                     f"{sample.seconds:.3f} detik, {sample.round_trips} round-trip, {sample.retries} retry")
+
+
+def add_bytes(count: int) -> None:
+    sample = _current.get()
+    if sample is not None:
+        sample.bytes += count
+
+
+def add_round_trips(count: int = 1) -> None:
+    sample = _current.get()
+    if sample is not None:
+        sample.round_trips += count
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    add_round_trips()
+
+
+def drain() -> list:
+    """Remove and return the samples recorded in this process (to hand them to a parent process)."""
+    with _lock:
+        taken = list(_samples)
+        _samples.clear()
+    return taken
+
+
+def record(samples) -> None:
+    """Add samples recorded elsewhere, e.g. returned by a worker process."""
+    with _lock:
+        _samples.extend(samples)
+
+
+def summarize(samples=None) -> dict:
+    """Per-table totals: rows, bytes, seconds, retries, round_trips, chunks, failed, buckets."""
+    if samples is None:
+        with _lock:
+            samples = list(_samples)
+    tables = {}
+    for sample in samples:
+        total = tables.setdefault(sample.table, {
+            'rows': 0, 'bytes': 0, 'seconds': 0.0, 'retries': 0, 'round_trips': 0,
+            'chunks': 0, 'failed': 0, 'buckets': [0] * len(LATENCY_BUCKETS),
+        })
+        total['rows'] += sample.rows
+        total['bytes'] += sample.bytes
+        total['seconds'] += sample.seconds
+        total['retries'] += sample.retries
+        total['round_trips'] += sample.round_trips
+        total['chunks'] += 1
+        total['failed'] += not sample.ok
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if sample.seconds <= bound:
+                total['buckets'][i] += 1
+    return tables
+
+
+def prometheus_text(samples=None) -> str:
+    """Render the per-table totals and the chunk latency histogram in Prometheus text format."""
+    tables = summarize(samples)
+    lines = []
+
+    def metric(name, kind, help_text, values):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(values)
+
+    def series(key):
+        return [f'{{table="{table}"}} {total[key]}' for table, total in tables.items()]
+
+    for key, help_text in (
+        ('rows', 'Rows loaded into staging'),
+        ('bytes', 'CSV bytes streamed with COPY'),
+        ('retries', 'Load attempts retried after a lost connection'),
+        ('round_trips', 'Statements sent to the database'),
+        ('chunks', 'Load units (chunks or whole frames)'),
+        ('failed', 'Load units that raised'),
+    ):
+        name = f"staging_load_{key}_total"
+        metric(name, 'counter', help_text, [name + value for value in series(key)])
+
+    name = 'staging_load_rows_per_second'
+    metric(name, 'gauge', 'Rows loaded per second of load time', [
+        f'{name}{{table="{table}"}} {total["rows"] / total["seconds"] if total["seconds"] else 0:.1f}'
+        for table, total in tables.items()
+    ])
+
+    name = 'staging_load_chunk_duration_seconds'
+    histogram = []
+    for table, total in tables.items():
+        for bound, count in zip(LATENCY_BUCKETS, total['buckets']):
+            histogram.append(f'{name}_bucket{{table="{table}",le="{bound}"}} {count}')
+        histogram.append(f'{name}_bucket{{table="{table}",le="+Inf"}} {total["chunks"]}')
+        histogram.append(f'{name}_sum{{table="{table}"}} {total["seconds"]:.6f}')
+        histogram.append(f'{name}_count{{table="{table}"}} {total["chunks"]}')
+    metric(name, 'histogram', 'Duration of one staging load unit', histogram)
+
+    metric('staging_load_last_run_timestamp_seconds', 'gauge', 'When these metrics were written',
+           [f"staging_load_last_run_timestamp_seconds {time.time():.0f}"])
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics(path: Path = None) -> Path:
+    """Write this run's metrics to ``path`` (atomically, so scrapers never see half a file)."""
+    path = Path(path) if path else METRICS_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + f'.{os.getpid()}.tmp')
+    partial.write_text(prometheus_text(), encoding='utf-8')
+    os.replace(partial, path)
+    return path
+
+
+def log_summary(emit=None) -> None:
+    """One line per table via ``emit`` (default: this module's logger; scripts pass ``print``)."""
+    emit = emit or logger.info
+    for table, total in summarize().items():
+        rate = total['rows'] / total['seconds'] if total['seconds'] else 0
+        emit(f"📊 {table}: {total['rows']} baris, {total['bytes'] / 1e6:.1f} MB, {total['chunks']} chunk, "
+             f"{total['seconds']:.2f} detik ({rate:,.0f} baris/detik), "
+             f"{total['round_trips']} round-trip, {total['retries']} retry")
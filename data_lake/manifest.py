@@ -0,0 +1,108 @@
+# MANIFEST: Catatan Persisten Sumber & Artefak Hasil Ingestion
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024  # 1 MiB per read when hashing
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, read in large blocks."""
+    digest = hashlib.sha256()
+    with path.open('rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """Persistent record of ingested sources and the artifacts derived from them.
+
+    Each source entry stores its size, mtime and content hash, plus the size
+    of every artifact produced from that exact source version. A source whose
+    size and mtime are unchanged is trusted without re-hashing, so a no-op
+    run only costs one ``stat`` per file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.root = self.path.parent
+        self.sources = {}
+        self._digests = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+                if data.get('version') == MANIFEST_VERSION:
+                    self.sources = data.get('sources', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable manifest {self.path}: {e}")
+
+    def _key(self, path: Path) -> str:
+        return Path(os.path.relpath(Path(path).resolve(), self.root.resolve())).as_posix()
+
+    def _digest(self, src: Path) -> str:
+        key = self._key(src)
+        if key not in self._digests:
+            self._digests[key] = file_digest(src)
+        return self._digests[key]
+
+    def needs_ingest(self, src: Path, artifacts) -> bool:
+        """Return True if ``src`` changed or any of its ``artifacts`` is missing or stale."""
+        entry = self.sources.get(self._key(src))
+        if entry is None:
+            return True
+
+        st = src.stat()
+        if st.st_size != entry['size'] or st.st_mtime_ns != entry['mtime_ns']:
+            # Metadata changed; only the content hash can tell if the data did
+            if self._digest(src) != entry['sha256']:
+                return True
+            entry['size'] = st.st_size
+            entry['mtime_ns'] = st.st_mtime_ns
+            self._dirty = True
+
+        recorded = entry.get('artifacts', {})
+        for artifact in artifacts:
+            info = recorded.get(self._key(artifact))
+            if info is None:
+                return True
+            try:
+                if Path(artifact).stat().st_size != info['size']:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def record(self, src: Path, artifacts) -> None:
+        """Record ``src`` at its current version together with the artifacts built from it."""
+        st = src.stat()
+        self.sources[self._key(src)] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': self._digest(src),
+            'ingested_at': datetime.now().isoformat(timespec='seconds'),
+            'artifacts': {
+                self._key(artifact): {'size': Path(artifact).stat().st_size}
+                for artifact in artifacts
+                if Path(artifact).exists()
+            },
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the manifest atomically (temp file + rename) if anything changed."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(
+            json.dumps({'version': MANIFEST_VERSION, 'sources': self.sources}, indent=2),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.path)
+        self._dirty = False
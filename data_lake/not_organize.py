@@ -1,35 +1,27 @@
 import os
 import shutil
+from pathlib import Path
+from source_registry import SourceRegistry
 
 def organize_files():
-    # Source directory
-    source_dir = r"C:\Users\hansc\OneDrive - Institut Teknologi Sepuluh Nopember\Semester 4 SISFOR\DLH\data_lake\data_lake\adventureworks\organized"
-    
-    # Destination directories
-    tweets_dir = r"C:\Users\hansc\OneDrive - Institut Teknologi Sepuluh Nopember\Semester 4 SISFOR\DLH\data_lake\data_lake\adventureworks\tweets"
-    files_dir = r"C:\Users\hansc\OneDrive - Institut Teknologi Sepuluh Nopember\Semester 4 SISFOR\DLH\data_lake\data_lake\adventureworks\files"
+    # Source routing comes from sources.json
+    registry = SourceRegistry.from_file(Path(__file__).parent / 'sources.json')
     
-    # Create destination directories if they don't exist
-    os.makedirs(tweets_dir, exist_ok=True)
-    os.makedirs(files_dir, exist_ok=True)
+    # Source directory
+    source_dir = registry.landing_dir
     
-    # Get all files in the source directory
-    for filename in os.listdir(source_dir):
-        source_path = os.path.join(source_dir, filename)
-        
-        # Skip directories
-        if os.path.isdir(source_path):
+    # Move each registered file to the archive directory of its rule
+    for source_path, rule in registry.scan(source_dir):
+        if not rule.archive:
             continue
-            
-        # Move files based on extension
-        if filename.lower().endswith('.txt'):
-            dest_path = os.path.join(tweets_dir, filename)
-            shutil.move(source_path, dest_path)
-            print(f"Moved {filename} to tweets folder")
-        elif filename.lower().endswith(('.pdf', '.csv')):
-            dest_path = os.path.join(files_dir, filename)
-            shutil.move(source_path, dest_path)
-            print(f"Moved {filename} to files folder")
+        dest_dir = registry.resolve(rule.archive)
+        
+        # Create destination directory if it doesn't exist
+        os.makedirs(dest_dir, exist_ok=True)
+        
+        dest_path = os.path.join(dest_dir, source_path.name)
+        shutil.move(str(source_path), dest_path)
+        print(f"Moved {source_path.name} to {rule.archive}")
 
 if __name__ == "__main__":
     organize_files()
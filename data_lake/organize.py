@@ -1,30 +1,28 @@
 import os
 import shutil
 from pathlib import Path
+from source_registry import SourceRegistry
 
 def organize_files():
     # Base directory
     base_dir = Path(__file__).parent
     
-    # Source files
-    source_files = {
-        'pdf': base_dir / 'adventureworks' / 'files' / 'market_share_report.pdf',
-        'txt': base_dir / 'adventureworks' / 'tweets' / 'adventureworks_structured_150_tweets.txt',
-        'csv': base_dir / 'adventureworks' / 'files' / 'warehouse_temp_sensor.csv'
-    }
+    # Source routing comes from sources.json
+    registry = SourceRegistry.from_file(base_dir / 'sources.json')
     
     # Destination directory
-    dest_dir = base_dir / 'data_lake' / 'adventureworks' / 'organized'
+    dest_dir = registry.landing_dir
     dest_dir.mkdir(parents=True, exist_ok=True)
     
-    # Organize files
-    for file_type, source_path in source_files.items():
-        if source_path.exists():
+    # Organize files: every registered file found in the inbox directories
+    for inbox_dir in registry.inbox_dirs:
+        source_files = registry.scan(inbox_dir)
+        if not source_files:
+            print(f"Warning: No registered source files found in {inbox_dir}")
+        for source_path, rule in source_files:
             dest_path = dest_dir / source_path.name
             shutil.copy2(source_path, dest_path)
             print(f"Copied {source_path} to {dest_path}")
-        else:
-            print(f"Warning: Source file not found: {source_path}")
 
 if __name__ == "__main__":
     organize_files()
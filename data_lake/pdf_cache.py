@@ -0,0 +1,121 @@
+# PDF CACHE: Cache Teks & Tabel per Halaman PDF, Dikunci dengan Hash Dokumen
+
+import json
+import os
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from manifest import file_digest
+
+BASE_DIR = Path(__file__).parent
+# PDF_CACHE_DIR lets benchmarks and tests point worker processes at a scratch cache
+CACHE_DIR = Path(os.environ.get('PDF_CACHE_DIR', BASE_DIR / "adventureworks" / "pdf_cache"))
+
+
+def _write_atomic(path: Path, data: str) -> None:
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp_path.write_text(data, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+class PdfPageCache:
+    """On-disk cache of PDF page text and ``find_tables()`` results.
+
+    Entries live in ``<cache_dir>/<sha256 of the PDF>/`` as one file per page,
+    so identical documents at different paths share one entry and any
+    process can fill in pages independently.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._keys = {}
+
+    def document_key(self, pdf_path: Path) -> str:
+        """Return the content hash of ``pdf_path`` (memoized on path, size and mtime)."""
+        st = Path(pdf_path).stat()
+        memo = (str(Path(pdf_path).resolve()), st.st_size, st.st_mtime_ns)
+        if memo not in self._keys:
+            self._keys[memo] = file_digest(Path(pdf_path))
+        return self._keys[memo]
+
+    def _entry(self, key: str) -> Path:
+        entry = self.cache_dir / key
+        entry.mkdir(parents=True, exist_ok=True)
+        return entry
+
+    def page_count(self, pdf_path: Path, key: str = None) -> int:
+        key = key or self.document_key(pdf_path)
+        meta_path = self._entry(key) / "meta.json"
+        if meta_path.exists():
+            return json.loads(meta_path.read_text(encoding='utf-8'))['page_count']
+        with fitz.open(pdf_path) as doc:
+            count = doc.page_count
+        _write_atomic(meta_path, json.dumps({'page_count': count}))
+        return count
+
+    def page_texts(self, pdf_path: Path, start: int = 0, stop: int = None, key: str = None) -> list:
+        """Return the text of pages [start, stop), opening the PDF only for cache misses."""
+        key = key or self.document_key(pdf_path)
+        stop = self.page_count(pdf_path, key) if stop is None else stop
+        entry = self._entry(key)
+        texts = []
+        doc = None
+        try:
+            for page_no in range(start, stop):
+                page_path = entry / f"page-{page_no:05d}.txt"
+                if page_path.exists():
+                    texts.append(page_path.read_text(encoding='utf-8'))
+                    continue
+                if doc is None:
+                    doc = fitz.open(pdf_path)
+                text = doc[page_no].get_text()
+                _write_atomic(page_path, text)
+                texts.append(text)
+        finally:
+            if doc is not None:
+                doc.close()
+        return texts
+
+    def page_tables(self, pdf_path: Path, key: str = None) -> list:
+        """Return ``[table.extract() for table in page.find_tables()]`` for every page."""
+        key = key or self.document_key(pdf_path)
+        entry = self._entry(key)
+        result = []
+        doc = None
+        try:
+            for page_no in range(self.page_count(pdf_path, key)):
+                tables_path = entry / f"page-{page_no:05d}.tables.json"
+                if tables_path.exists():
+                    result.append(json.loads(tables_path.read_text(encoding='utf-8')))
+                    continue
+                if doc is None:
+                    doc = fitz.open(pdf_path)
+                tables = [table.extract() for table in doc[page_no].find_tables().tables]
+                _write_atomic(tables_path, json.dumps(tables))
+                result.append(tables)
+        finally:
+            if doc is not None:
+                doc.close()
+        return result
+
+
+_default_cache = PdfPageCache()
+
+
+def page_texts(pdf_path: Path, start: int = 0, stop: int = None, key: str = None) -> list:
+    """Page texts from the shared default cache."""
+    return _default_cache.page_texts(pdf_path, start, stop, key)
+
+
+def page_tables(pdf_path: Path) -> list:
+    """Per-page ``find_tables()`` results from the shared default cache."""
+    return _default_cache.page_tables(pdf_path)
+
+
+def document_key(pdf_path: Path) -> str:
+    return _default_cache.document_key(pdf_path)
+
+
+def page_count(pdf_path: Path, key: str = None) -> int:
+    return _default_cache.page_count(pdf_path, key)
@@ -0,0 +1,211 @@
+# PUSHDOWN: Fact Load Set-Based (INSERT ... SELECT) yang Dijalankan Seluruhnya di Database DWH
+
+import re
+
+import pandas as pd
+from sqlalchemy import text
+
+from bulk_load import ensure_unique_key
+from db import connection_params, load_config
+from staging_partitions import time_window
+from staging_schema import SENTIMENT_LABELS, SENTIMENT_TYPE, STAGING_TABLES
+from time_dimension import outside_calendar
+from watermark import (after_watermark, clear_pending, ensure_watermark_table, get_watermark, retire_unresolved,
+                       set_watermark, unresolved_reasons)
+
+# Server postgres_fdw di database DWH yang menunjuk ke database staging
+STAGING_SERVER = 'staging_server'
+
+
+def same_database(first: str = 'staging', second: str = 'dwh') -> bool:
+    """True when both config sections point at the same PostgreSQL database."""
+    a, b = connection_params(first), connection_params(second)
+    return all(a[key] == b[key] for key in ('host', 'port', 'dbname'))
+
+
+def staging_schema() -> str:
+    """Schema in the DWH database where the staging tables are visible.
+
+    ``staging_schema`` in database.ini [dwh] wins; otherwise 'public' when
+    staging and DWH share a database, else 'staging' (filled with
+    postgres_fdw foreign tables by ``ensure_staging_link``).
+    """
+    configured = load_config()['dwh'].get('staging_schema')
+    if configured:
+        return configured
+    return 'public' if same_database() else 'staging'
+
+
+def _identifier(name: str) -> str:
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', name):
+        raise ValueError(f"Nama schema/tabel tidak valid: {name!r}")
+    return name
+
+
+def _literal(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def ensure_staging_link(conn, tables=None) -> str:
+    """Make the staging tables queryable from the DWH connection ``conn``; return their schema.
+
+    When staging and DWH are separate databases the tables are imported as
+    postgres_fdw foreign tables (re-imported each run, so new staging
+    columns show up). Joins and filters on them are then executed by the
+    database servers; no row passes through this client. Run it once
+    before the fact loads below, not concurrently with them.
+    """
+    schema = _identifier(staging_schema())
+    if same_database():
+        return schema
+    tables = [_identifier(table) for table in (tables or STAGING_TABLES)]
+    staging = connection_params('staging')
+    options = ', '.join([f"{key} {_literal(staging[key])}" for key in ('host', 'port', 'dbname') if staging[key]]
+                        + ["fetch_size '10000'"])
+    mapping = ', '.join(f"{key} {_literal(staging[key])}" for key in ('user', 'password') if staging[key])
+
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgres_fdw"))
+    conn.execute(text(f"CREATE SERVER IF NOT EXISTS {STAGING_SERVER} FOREIGN DATA WRAPPER postgres_fdw OPTIONS ({options})"))
+    conn.execute(text(f"CREATE USER MAPPING IF NOT EXISTS FOR CURRENT_USER SERVER {STAGING_SERVER}"
+                      + (f" OPTIONS ({mapping})" if mapping else "")))
+    # Kolom enum staging butuh tipe yang sama di database DWH
+    labels = ', '.join(_literal(label) for label in SENTIMENT_LABELS)
+    conn.execute(text(
+        f"DO $$ BEGIN CREATE TYPE {SENTIMENT_TYPE} AS ENUM ({labels}); "
+        "EXCEPTION WHEN duplicate_object OR unique_violation THEN NULL; END $$"
+    ))
+    conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    for table in tables:
+        conn.execute(text(f"DROP FOREIGN TABLE IF EXISTS {schema}.{table}"))
+    conn.execute(text(
+        f"IMPORT FOREIGN SCHEMA public LIMIT TO ({', '.join(tables)}) FROM SERVER {STAGING_SERVER} INTO {schema}"
+    ))
+    return schema
+
+
+def load_fact_sentiment(engine_dwh, key_columns, start=None, end=None, full_refresh=False) -> int:
+    """fact_sentiment as one INSERT ... SELECT: staging rows past the watermark joined to the dimensions.
+
+    Same semantics as structure.load_fact_sentiment (watermark, unique key
+    on ``key_columns``, ON CONFLICT DO NOTHING); the watermark advances in
+    the same transaction, only on runs without ``start``/``end`` and only up
+    to the row before the first one whose dimension keys are not there yet
+    (that row is retried next run). Rows still unresolved after
+    MAX_UNRESOLVED_RUNS runs, or dated outside dim_time, are quarantined and
+    the watermark moves past them; only those unresolved rows are read into
+    Python. Returns the number of rows inserted.
+    """
+    with engine_dwh.begin() as conn:
+        schema = _identifier(staging_schema())
+        ensure_unique_key(conn, 'fact_sentiment', key_columns, schema='dwh')
+        keys = ', '.join(_identifier(col) for col in key_columns)
+        ensure_watermark_table(conn)
+        mark = None if full_refresh else get_watermark(conn, 'fact_sentiment')
+        window, params = time_window(start, end, alias='s')
+        incremental, mark_params = after_watermark(mark, 's.timestamp', 's.tweet_id')
+        # Baris bertanda key disimpan sementara: dipakai untuk insert, karantina & batas watermark
+        conn.execute(text(f"""
+            CREATE TEMP TABLE keyed_fact_sentiment ON COMMIT DROP AS
+            WITH src AS MATERIALIZED (
+                SELECT s.tweet_id, s.timestamp, s.matched_product, s.polarity
+                FROM {schema}.staging_external_sentiment s
+                WHERE {window} AND {incremental}
+            )
+            SELECT src.tweet_id, src.timestamp, src.matched_product, src.polarity, tp.topic_id, ti.time_id,
+                   dt.tweet_id IS NULL AS no_tweet
+            FROM src
+            LEFT JOIN dwh.dim_tweet dt ON dt.tweet_id = src.tweet_id::varchar
+            LEFT JOIN dwh.dim_topic tp ON tp.keyword = src.matched_product
+            LEFT JOIN dwh.dim_time ti ON ti.grain = 'day' AND ti.timestamp = date_trunc('day', src.timestamp)
+        """), {**params, **mark_params})
+        inserted = conn.execute(text(f"""
+            INSERT INTO dwh.fact_sentiment (tweet_id, topic_id, time_id, polarity)
+            SELECT tweet_id::varchar, topic_id, time_id, polarity
+            FROM keyed_fact_sentiment
+            WHERE NOT no_tweet AND topic_id IS NOT NULL AND time_id IS NOT NULL
+            ON CONFLICT ({keys}) DO NOTHING
+        """)).rowcount
+        if start is not None or end is not None:
+            return inserted
+
+        # Hanya baris yang belum punya key yang dibaca ke Python, untuk dihitung/dikarantina
+        unresolved = pd.read_sql(text("""
+            SELECT tweet_id, timestamp, matched_product, polarity, topic_id, time_id, no_tweet
+            FROM keyed_fact_sentiment
+            WHERE no_tweet OR topic_id IS NULL OR time_id IS NULL
+        """), con=conn)
+        missing = pd.DataFrame({
+            'unresolved:dim_tweet': unresolved['no_tweet'],
+            'unresolved:dim_topic': unresolved['topic_id'].isna(),
+            'unresolved:dim_time': unresolved['time_id'].isna(),
+        })
+        given_up = retire_unresolved(conn, 'fact_sentiment', unresolved.drop(columns='no_tweet'),
+                                     'timestamp', 'tweet_id', unresolved_reasons(missing),
+                                     outside_calendar(conn, unresolved['timestamp']),
+                                     source='staging_external_sentiment')
+        waiting = unresolved.loc[~given_up].sort_values(['timestamp', 'tweet_id'])
+        bound, bound_params = 'TRUE', {}
+        if not waiting.empty:
+            bound = '(timestamp, tweet_id) < (:pending_timestamp, :pending_id)'
+            bound_params = {'pending_timestamp': waiting['timestamp'].iloc[0].to_pydatetime(),
+                            'pending_id': int(waiting['tweet_id'].iloc[0])}
+        high = conn.execute(text(f"""
+            SELECT timestamp, tweet_id FROM keyed_fact_sentiment
+            WHERE {bound}
+            ORDER BY timestamp DESC, tweet_id DESC LIMIT 1
+        """), bound_params).first()
+        if high is not None:
+            set_watermark(conn, 'fact_sentiment', high.timestamp, high.tweet_id)
+            clear_pending(conn, 'fact_sentiment', (high.timestamp, high.tweet_id))
+    return inserted
+
+
+def load_fact_competitor_share(engine_dwh) -> int:
+    """fact_competitor_share as one INSERT ... SELECT (competitor & extraction date matched in the database).
+
+    One row per (competitor_id, time_id): the latest extraction of the day
+    wins within the batch, and keys already in the fact table are skipped.
+    """
+    with engine_dwh.begin() as conn:
+        schema = _identifier(staging_schema())
+        # Kolom sama dengan tabel yang dibuat to_sql pada mode pandas
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS dwh.fact_competitor_share (
+                competitor_id BIGINT,
+                market_share_percent DOUBLE PRECISION,
+                time_id BIGINT
+            )
+        """))
+        return conn.execute(text(f"""
+            INSERT INTO dwh.fact_competitor_share (competitor_id, market_share_percent, time_id)
+            SELECT DISTINCT ON (c.competitor_id, t.time_id) c.competitor_id, m.market_share_percent, t.time_id
+            FROM {schema}.staging_market_share_report m
+            JOIN dwh.dim_competitor c ON c.competitor = m.competitor
+            JOIN dwh.dim_time t ON t.grain = 'day' AND t.timestamp = date_trunc('day', m.extraction_date)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM dwh.fact_competitor_share f
+                WHERE f.competitor_id = c.competitor_id AND f.time_id = t.time_id
+            )
+            ORDER BY c.competitor_id, t.time_id, m.extraction_date DESC
+        """)).rowcount
+
+
+def load_fact_temperature(engine_dwh, start=None, end=None) -> int:
+    """fact_temperature as one INSERT ... SELECT: readings averaged per sensor and hourly dim_time key.
+
+    fact_temperature is unique on (sensor_id, time_id), so readings are
+    aggregated to that grain in the database and re-loads update the value.
+    """
+    with engine_dwh.begin() as conn:
+        schema = _identifier(staging_schema())
+        window, params = time_window(start, end, alias='s')
+        return conn.execute(text(f"""
+            INSERT INTO dwh.fact_temperature (sensor_id, time_id, temperature_c)
+            SELECT s.sensor_id, t.time_id, avg(s.temperature_c)
+            FROM {schema}.staging_warehouse_temp_sensor s
+            JOIN dwh.dim_sensor ds ON ds.sensor_id = s.sensor_id
+            JOIN dwh.dim_time t ON t.grain = 'hour' AND t.timestamp = date_trunc('hour', s.timestamp)
+            WHERE s.temperature_c IS NOT NULL AND {window}
+            GROUP BY s.sensor_id, t.time_id
+            ON CONFLICT (sensor_id, time_id) DO UPDATE SET temperature_c = EXCLUDED.temperature_c
+        """), params).rowcount
@@ -2,7 +2,8 @@
 Script untuk menghapus data dari tabel-tabel staging di database.
 """
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from db import get_engine
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
@@ -13,20 +14,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Konfigurasi database
-DB_CONFIG = {
-    'dbname': 'staging',
-    'user': 'postgres',
-    'password': 'chriscakra15',
-    'host': 'localhost',
-    'port': '5432'
-}
-
 def get_database_connection():
     """Membuat koneksi ke database"""
     try:
-        conn_str = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
-        return create_engine(conn_str)
+        return get_engine('staging')
     except Exception as e:
         logger.error(f"Gagal terhubung ke database: {e}")
         raise
@@ -3,7 +3,8 @@ Script untuk menghapus semua data dari database AdventureworksDW.
 Hanya menghapus isi data dari tabel-tabel, tidak menghapus schema atau struktur tabel.
 """
 
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import text, inspect
+from db import connection_params, get_engine
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
@@ -16,19 +17,14 @@ logger = logging.getLogger(__name__)
 
 # Konfigurasi database AdventureworksDW
 DB_CONFIG = {
-    'dbname': 'AdventureworksDW',  # Nama database AdventureworksDW
-    'user': 'postgres',
-    'password': 'chriscakra15',
-    'host': 'localhost',
-    'port': '5432',
+    'dbname': connection_params('dwh')['dbname'],  # Dari database.ini [dwh]
     'schemas': ['dwh']  # Schema yang akan dibersihkan
 }
 
 def get_database_connection():
     """Membuat koneksi ke database"""
     try:
-        conn_str = f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['dbname']}"
-        return create_engine(conn_str)
+        return get_engine('dwh')
     except Exception as e:
         logger.error(f"Gagal terhubung ke database {DB_CONFIG['dbname']}: {e}")
         raise
@@ -0,0 +1,87 @@
+# REGISTRY: Pemetaan Deklaratif File Sumber → Handler & Tujuan (sources.json)
+
+import fnmatch
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_CONFIG = BASE_DIR / "sources.json"
+# Extraction handlers implemented in ingest.py
+HANDLERS = ('csv', 'pdf', 'txt')
+# Raw-zone outputs: text dump, Parquet dataset (CSV only), or both
+RAW_FORMATS = ('text', 'parquet', 'both')
+
+
+@dataclass(frozen=True)
+class SourceRule:
+    """One entry of sources.json: a filename glob and where its files go."""
+    name: str
+    pattern: str
+    handler: str
+    destination: str
+    archive: str = None
+    staging_table: str = None
+    raw_format: str = 'text'
+    partition_column: str = None
+
+
+class SourceRegistry:
+    """Glob-pattern registry loaded from a JSON config file.
+
+    All directories in the config are relative to the data_lake directory.
+    Rules are matched in file order and the first match wins.
+    """
+
+    def __init__(self, config: dict, base_dir: Path = BASE_DIR):
+        self.base_dir = Path(base_dir)
+        self.landing_dir = self.base_dir / config['landing_dir']
+        self.inbox_dirs = [self.base_dir / d for d in config.get('inbox_dirs', [])]
+        self.exclude = list(config.get('exclude', []))
+        self.rules = [SourceRule(**rule) for rule in config['sources']]
+        for rule in self.rules:
+            if rule.handler not in HANDLERS:
+                raise ValueError(f"Unknown handler '{rule.handler}' for source '{rule.name}'")
+            if rule.raw_format not in RAW_FORMATS:
+                raise ValueError(f"Unknown raw_format '{rule.raw_format}' for source '{rule.name}'")
+            if rule.raw_format != 'text' and rule.handler != 'csv':
+                raise ValueError(f"Parquet output is only supported for CSV sources ('{rule.name}')")
+
+    @classmethod
+    def from_file(cls, path: Path = DEFAULT_CONFIG) -> "SourceRegistry":
+        with Path(path).open(encoding='utf-8') as f:
+            return cls(json.load(f), base_dir=Path(path).parent)
+
+    def resolve(self, relative: str) -> Path:
+        """Resolve a config-relative directory against the data_lake directory."""
+        return self.base_dir / relative
+
+    def match(self, filename: str):
+        """Return the first rule whose pattern matches ``filename``, or None."""
+        if any(fnmatch.fnmatch(filename, pattern) for pattern in self.exclude):
+            return None
+        for rule in self.rules:
+            if fnmatch.fnmatch(filename, rule.pattern):
+                return rule
+        return None
+
+    def scan(self, directory: Path = None):
+        """Scan ``directory`` (default: the landing dir) once.
+
+        Returns a list of (path, rule) for every regular file that matches a
+        rule, sorted by filename so runs are deterministic.
+        """
+        directory = Path(directory) if directory is not None else self.landing_dir
+        if not directory.is_dir():
+            return []
+        found = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                rule = self.match(entry.name)
+                if rule is not None:
+                    found.append((Path(entry.path), rule))
+        found.sort(key=lambda item: item[0].name)
+        return found
@@ -10,56 +10,43 @@ various sources (CSV, PDF) into a staging database. It includes functionality to
 """
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import psycopg2 
 from psycopg2 import sql
 import os
-import fitz  # PyMuPDF
 import re
+import pdf_cache
+import load_metrics
+from bulk_load import copy_dataframe
+from db import connection_params, get_engine
+from tweet_reader import read_tweets
 
 def setup_database():
-    """Set up the database connection and create database if it doesn't exist."""
-    # Konfigurasi koneksi PostgreSQL
-    DB_NAME = 'staging'
-    DB_USER = 'postgres'
-    DB_PASS = 'chriscakra15'
-    DB_HOST = 'localhost'
-    DB_PORT = '5432'
+    """Create the staging database if it doesn't exist and return its shared engine."""
+    # Konfigurasi koneksi PostgreSQL dari database.ini [staging]
+    params = connection_params('staging')
 
     # Cek dan buat database jika belum ada
     try:
         # Coba konek ke database
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS,
-            host=DB_HOST,
-            port=DB_PORT
-        )
+        conn = psycopg2.connect(**params)
         conn.close()
     except psycopg2.OperationalError:
         # Jika database tidak ada, buat database baru
-        conn = psycopg2.connect(
-            dbname='postgres',  # Connect ke database default 'postgres'
-            user=DB_USER,
-            password=DB_PASS,
-            host=DB_HOST,
-            port=DB_PORT
-        )
+        conn = psycopg2.connect(**{**params, 'dbname': 'postgres'})  # Connect ke database default 'postgres'
         conn.autocommit = True
         cur = conn.cursor()
         cur.execute(sql.SQL("CREATE DATABASE {}").format(
-            sql.Identifier(DB_NAME))
+            sql.Identifier(params['dbname']))
         )
         cur.close()
         conn.close()
 
-    return f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    return get_engine('staging')
 
 def extract_text_from_pdf(path):
     """Extract text from PDF file."""
-    with fitz.open(path) as doc:
-        return "\n".join(page.get_text() for page in doc)
+    return "\n".join(pdf_cache.page_texts(path))
 
 def parse_market_share(text):
     """Parse market share data from text."""
@@ -72,18 +59,13 @@ def parse_market_share(text):
 def main():
     """Main function to run the ETL process."""
     # Set up database connection
-    db_url = setup_database()
-    engine = create_engine(db_url)
+    engine = setup_database()
 
     # Baca structured .txt
     base_dir = os.path.dirname(os.path.abspath(__file__))
     structured_txt_path = os.path.join(base_dir, "adventureworks", "tweets", "adventureworks_structured_150_tweets.txt")
-    df = pd.read_csv(structured_txt_path, sep='\t', header=None, names=[
-        'tweet_id', 'tweet_text', 'timestamp', 'user_location', 'sentiment', 'matched_product'
-    ])
-
-    # Ubah timestamp ke format datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    # Parser tweet bersama: dtype eksplisit, timestamp datetime, kolom kategori
+    df = read_tweets(structured_txt_path)
 
     # Simpan ke PostgreSQL (tabel 'external_sentiment' di DB 'stagging')
     # ==================== INGEST FILE CSV ==================== #
@@ -91,7 +73,8 @@ def main():
 
     try:
         df_sensor = pd.read_csv(csv_path)
-        df_sensor.to_sql("warehouse_temp_sensor", con=engine, index=False, if_exists='replace')
+        with load_metrics.measure("warehouse_temp_sensor") as sample, engine.begin() as conn:
+            sample.rows = copy_dataframe(df_sensor, "warehouse_temp_sensor", conn, if_exists='replace')
         print("✅ Berhasil mengimpor data ke stagging.warehouse_temp_sensor")
     except Exception as e:
         print(f"❌ Gagal memuat CSV: {e}")
@@ -102,14 +85,19 @@ def main():
     try:
         pdf_text = extract_text_from_pdf(pdf_path)
         df_pdf = parse_market_share(pdf_text)
-        df_pdf.to_sql("market_share_report", con=engine, index=False, if_exists='replace')
+        with load_metrics.measure("market_share_report") as sample, engine.begin() as conn:
+            sample.rows = copy_dataframe(df_pdf, "market_share_report", conn, if_exists='replace')
         print("✅ Berhasil mengimpor data ke stagging.market_share_report")
     except Exception as e:
         print(f"❌ Gagal memuat PDF: {e}")
 
-    df.to_sql("external_sentiment", con=engine, index=False, if_exists='replace')       
-
-    print("✅ Berhasil mengimpor data ke stagging.external_sentiment")
+    try:
+        with load_metrics.measure("external_sentiment") as sample, engine.begin() as conn:
+            sample.rows = copy_dataframe(df, "external_sentiment", conn, if_exists='replace')
+        print("✅ Berhasil mengimpor data ke stagging.external_sentiment")
+    finally:
+        load_metrics.log_summary(print)
+        print(f"📊 Metrik load ditulis ke {load_metrics.write_metrics()}")
 
 if __name__ == "__main__":
     main()
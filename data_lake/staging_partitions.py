@@ -0,0 +1,145 @@
+# STAGING PARTITIONS: Partisi Range per Hari/Bulan untuk Tabel Staging Berbasis Waktu
+
+import logging
+
+import pandas as pd
+from sqlalchemy import text
+
+from bulk_load import create_table_sql
+
+logger = logging.getLogger(__name__)
+
+# Tabel staging yang dipartisi: tabel -> (kolom waktu, granularitas 'day' atau 'month')
+PARTITIONED_TABLES = {
+    'staging_warehouse_temp_sensor': ('timestamp', 'day'),
+    'staging_external_sentiment': ('timestamp', 'month'),
+}
+
+
+def _period_starts(start, end, grain: str) -> pd.DatetimeIndex:
+    freq = 'D' if grain == 'day' else 'MS'
+    first = pd.Timestamp(start).normalize()
+    if grain == 'month':
+        first = first.replace(day=1)
+    return pd.date_range(first, pd.Timestamp(end), freq=freq)
+
+
+def partition_name(table_name: str, period_start, grain: str) -> str:
+    fmt = '%Y%m%d' if grain == 'day' else '%Y%m'
+    return f"{table_name}_p{pd.Timestamp(period_start).strftime(fmt)}"
+
+
+def _relkind(conn, table_name: str, schema: str = None):
+    return conn.execute(text(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE c.relname = :name AND n.nspname = COALESCE(:schema, current_schema())"
+    ), {'name': table_name, 'schema': schema}).scalar()
+
+
+def _quoted(conn, name: str, schema: str = None) -> str:
+    quote = conn.dialect.identifier_preparer.quote
+    return f"{quote(schema)}.{quote(name)}" if schema else quote(name)
+
+
+def existing_partitions(conn, table_name: str, schema: str = None) -> set:
+    return set(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {'parent': _quoted(conn, table_name, schema)}).scalars())
+
+
+def ensure_partitions(conn, table_name: str, start, end, schema: str = None) -> list:
+    """Create the day/month partitions of ``table_name`` covering [start, end] if missing.
+
+    Existing partitions are read from the catalog in one query, so the
+    parent is only locked for DDL when a new period actually appears.
+    """
+    column, grain = PARTITIONED_TABLES[table_name]
+    offset = pd.offsets.Day(1) if grain == 'day' else pd.offsets.MonthBegin(1)
+    existing = existing_partitions(conn, table_name, schema)
+    created = []
+    for period_start in _period_starts(start, end, grain):
+        name = partition_name(table_name, period_start, grain)
+        if name in existing:
+            continue
+        upper = period_start + offset
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {_quoted(conn, name, schema)} "
+            f"PARTITION OF {_quoted(conn, table_name, schema)} "
+            f"FOR VALUES FROM ('{period_start:%Y-%m-%d %H:%M:%S}') TO ('{upper:%Y-%m-%d %H:%M:%S}')"
+        ))
+        created.append(name)
+    return created
+
+
+def ensure_partitioned_table(conn, table_name: str, df: pd.DataFrame, schema: str = None) -> None:
+    """Create ``table_name`` as a range-partitioned table, converting a plain heap table in place.
+
+    A heap table left by earlier runs is renamed, recreated partitioned with
+    the same columns, refilled partition by partition and dropped. Rows with
+    a NULL timestamp cannot be routed to a partition and are discarded.
+    """
+    column, _ = PARTITIONED_TABLES[table_name]
+    quote = conn.dialect.identifier_preparer.quote
+    table = _quoted(conn, table_name, schema)
+    kind = _relkind(conn, table_name, schema)
+    if kind == 'p':
+        return
+    if kind is None:
+        ddl = create_table_sql(conn, df, table_name, schema)
+        conn.execute(text(f"{ddl} PARTITION BY RANGE ({quote(column)})"))
+        logger.info(f"Tabel {table_name} dibuat dengan partisi range pada {column}")
+        return
+
+    legacy_name = f"{table_name}_unpartitioned"[:63]
+    legacy = _quoted(conn, legacy_name, schema)
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {quote(legacy_name)}"))
+    conn.execute(text(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({quote(column)})"))
+    low, high, dropped = conn.execute(text(
+        f"SELECT MIN({quote(column)}), MAX({quote(column)}), COUNT(*) FILTER (WHERE {quote(column)} IS NULL) FROM {legacy}"
+    )).one()
+    if low is not None:
+        ensure_partitions(conn, table_name, low, high, schema)
+        conn.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy} WHERE {quote(column)} IS NOT NULL"))
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    logger.info(f"Tabel {table_name} dikonversi ke partisi range pada {column}"
+                + (f" ({dropped} baris tanpa {column} dibuang)" if dropped else ""))
+
+
+def prepare_partitions(conn, table_name: str, df: pd.DataFrame, schema: str = None) -> None:
+    """Make sure ``table_name`` is partitioned and has partitions for every timestamp in ``df``."""
+    if table_name not in PARTITIONED_TABLES:
+        return
+    ensure_partitioned_table(conn, table_name, df, schema)
+    ensure_frame_partitions(conn, table_name, df, schema)
+
+
+def ensure_frame_partitions(conn, table_name: str, df: pd.DataFrame, schema: str = None) -> None:
+    """Create the partitions covering the timestamps in ``df`` of an already partitioned table.
+
+    The per-chunk half of ``prepare_partitions``: one catalog query, and DDL
+    only when the chunk reaches a new period.
+    """
+    if table_name not in PARTITIONED_TABLES:
+        return
+    column, _ = PARTITIONED_TABLES[table_name]
+    values = pd.to_datetime(df[column], errors='coerce').dropna()
+    if not values.empty:
+        ensure_partitions(conn, table_name, values.min(), values.max(), schema)
+
+
+def time_window(start=None, end=None, column: str = 'timestamp', alias: str = None):
+    """SQL predicate and parameters restricting ``column`` to [start, end).
+
+    A range predicate on the partition key lets PostgreSQL prune every
+    partition outside the window. Returns ('TRUE', {}) when no bound is given.
+    """
+    qualified = f"{alias}.{column}" if alias else column
+    clauses, params = [], {}
+    if start is not None:
+        clauses.append(f"{qualified} >= :window_start")
+        params['window_start'] = pd.Timestamp(start).to_pydatetime()
+    if end is not None:
+        clauses.append(f"{qualified} < :window_end")
+        params['window_end'] = pd.Timestamp(end).to_pydatetime()
+    return (' AND '.join(clauses) or 'TRUE'), params
@@ -0,0 +1,150 @@
+# STAGING SCHEMA: Definisi Tipe Kolom Ringkas, DDL & Index untuk Tabel Staging
+
+import logging
+
+from sqlalchemy import text
+
+from bulk_load import ensure_unique_key
+from staging_partitions import PARTITIONED_TABLES, ensure_partitioned_table
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_TYPE = 'sentiment_label'
+SENTIMENT_LABELS = ('negative', 'neutral', 'positive')
+
+# Kolom (nama, tipe, NOT NULL), natural key (unique index) dan index tambahan per tabel staging
+STAGING_TABLES = {
+    'staging_warehouse_temp_sensor': {
+        'columns': [
+            ('timestamp', 'TIMESTAMP', True),
+            ('sensor_id', 'VARCHAR(32)', True),
+            ('temperature_c', 'REAL', False),
+        ],
+        'key': ['sensor_id', 'timestamp'],
+        'indexes': [],
+    },
+    'staging_external_sentiment': {
+        'columns': [
+            ('tweet_id', 'BIGINT', True),
+            ('tweet_text', 'TEXT', False),
+            ('timestamp', 'TIMESTAMP', True),
+            ('user_location', 'VARCHAR(100)', False),
+            ('sentiment', SENTIMENT_TYPE, False),
+            ('matched_product', 'VARCHAR(100)', False),
+        ],
+        # Termasuk timestamp: unique key tabel berpartisi harus memuat kolom partisi
+        'key': ['tweet_id', 'timestamp'],
+        'indexes': [['matched_product']],
+        # Polaritas dihitung sekali saat load, bukan di setiap query fact
+        'generated': [
+            ('polarity', 'SMALLINT', "CASE sentiment WHEN 'positive' THEN 1 WHEN 'negative' THEN -1 ELSE 0 END"),
+        ],
+    },
+    'staging_market_share_report': {
+        'columns': [
+            ('time_periode', 'VARCHAR(32)', True),
+            ('competitor', 'VARCHAR(200)', True),
+            ('market_share_percent', 'REAL', False),
+            ('extraction_date', 'TIMESTAMP', False),
+        ],
+        'key': ['competitor', 'time_periode'],
+        'indexes': [],
+    },
+}
+
+
+def _quote(conn, name: str) -> str:
+    return conn.dialect.identifier_preparer.quote(name)
+
+
+def ensure_types(conn) -> None:
+    """Create the enum types used by staging columns."""
+    labels = ', '.join(f"'{label}'" for label in SENTIMENT_LABELS)
+    conn.execute(text(
+        "DO $$ BEGIN "
+        f"CREATE TYPE {SENTIMENT_TYPE} AS ENUM ({labels}); "
+        # unique_violation: another loader created the type concurrently
+        "EXCEPTION WHEN duplicate_object OR unique_violation THEN NULL; END $$"
+    ))
+
+
+def create_table_ddl(conn, table_name: str) -> str:
+    """CREATE TABLE statement for a declared staging table (range-partitioned when configured)."""
+    spec = STAGING_TABLES[table_name]
+    columns = [
+        f"{_quote(conn, name)} {sql_type}{' NOT NULL' if not_null else ''}"
+        for name, sql_type, not_null in spec['columns']
+    ]
+    columns += [
+        f"{_quote(conn, name)} {sql_type} GENERATED ALWAYS AS ({expression}) STORED"
+        for name, sql_type, expression in spec.get('generated', [])
+    ]
+    ddl = f"CREATE TABLE IF NOT EXISTS {_quote(conn, table_name)} (\n    " + ',\n    '.join(columns) + "\n)"
+    if table_name in PARTITIONED_TABLES:
+        ddl += f" PARTITION BY RANGE ({_quote(conn, PARTITIONED_TABLES[table_name][0])})"
+    return ddl
+
+
+def _current_types(conn, table_name: str) -> dict:
+    rows = conn.execute(text(
+        "SELECT a.attname, format_type(a.atttypid, a.atttypmod), a.attgenerated <> '' "
+        "FROM pg_attribute a WHERE a.attrelid = CAST(:table AS regclass) AND a.attnum > 0 AND NOT a.attisdropped"
+    ), {'table': _quote(conn, table_name)}).all()
+    return {name: (sql_type, generated) for name, sql_type, generated in rows}
+
+
+def _normalized(sql_type: str) -> str:
+    aliases = {'VARCHAR': 'CHARACTER VARYING', 'TIMESTAMP': 'TIMESTAMP WITHOUT TIME ZONE'}
+    sql_type = sql_type.upper()
+    for short, full in aliases.items():
+        if sql_type.startswith(short) and not sql_type.startswith(full):
+            sql_type = full + sql_type[len(short):]
+    return sql_type
+
+
+def ensure_staging_table(conn, table_name: str) -> bool:
+    """Create or upgrade ``table_name`` to its declared schema and indexes before a load.
+
+    New tables get the compact DDL directly. Tables created earlier by
+    ``to_sql`` (TEXT/BIGINT/DOUBLE columns) are converted in place with
+    ``ALTER COLUMN ... TYPE ... USING``, and missing generated columns and
+    indexes are added. Returns False for tables without a declaration.
+    """
+    spec = STAGING_TABLES.get(table_name)
+    if spec is None:
+        return False
+    if any(sql_type == SENTIMENT_TYPE for _, sql_type, _ in spec['columns']):
+        ensure_types(conn)
+    existing = _current_types(conn, table_name) if conn.execute(
+        text("SELECT to_regclass(:table)"), {'table': _quote(conn, table_name)}).scalar() else None
+
+    if existing is None:
+        conn.execute(text(create_table_ddl(conn, table_name)))
+        logger.info(f"Tabel {table_name} dibuat dari skema staging")
+    else:
+        if table_name in PARTITIONED_TABLES:
+            ensure_partitioned_table(conn, table_name, None)
+        for name, sql_type, _ in spec['columns']:
+            current = existing.get(name)
+            if current is None or _normalized(current[0]) == _normalized(sql_type):
+                continue
+            logger.info(f"Kolom {table_name}.{name}: {current[0]} → {sql_type}")
+            conn.execute(text(
+                f"ALTER TABLE {_quote(conn, table_name)} ALTER COLUMN {_quote(conn, name)} "
+                f"TYPE {sql_type} USING {_quote(conn, name)}::{sql_type}"
+            ))
+        for name, sql_type, expression in spec.get('generated', []):
+            if name not in existing:
+                conn.execute(text(
+                    f"ALTER TABLE {_quote(conn, table_name)} ADD COLUMN {_quote(conn, name)} "
+                    f"{sql_type} GENERATED ALWAYS AS ({expression}) STORED"
+                ))
+
+    ensure_unique_key(conn, table_name, spec['key'])
+    for columns in spec['indexes']:
+        index_name = f"{table_name}_{'_'.join(columns)}_idx"[:63]
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {_quote(conn, index_name)} ON {_quote(conn, table_name)} "
+            f"({', '.join(_quote(conn, col) for col in columns)})"
+        ))
+    return True
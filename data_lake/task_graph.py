@@ -0,0 +1,134 @@
+# TASK GRAPH: Eksekutor DAG Kecil — Task Paralel Sesuai Dependensi, Retry per Task & Laporan
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Task:
+    """A named unit of work that may start once every task in ``deps`` succeeded."""
+    name: str
+    func: Callable
+    deps: Tuple[str, ...] = ()
+    retries: int = 0
+    retry_delay: float = 1.0
+
+
+@dataclass
+class TaskResult:
+    name: str
+    status: str = 'pending'  # 'ok', 'failed' or 'skipped'
+    attempts: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _check_graph(tasks) -> dict:
+    by_name = {}
+    for task in tasks:
+        if task.name in by_name:
+            raise ValueError(f"Task {task.name} didefinisikan dua kali")
+        by_name[task.name] = task
+    for task in tasks:
+        unknown = [dep for dep in task.deps if dep not in by_name]
+        if unknown:
+            raise ValueError(f"Task {task.name} bergantung pada task yang tidak ada: {unknown}")
+
+    # Kahn: graf harus bisa diurutkan topologis
+    remaining = {task.name: len(set(task.deps)) for task in tasks}
+    ready = [name for name, count in remaining.items() if count == 0]
+    seen = 0
+    while ready:
+        name = ready.pop()
+        seen += 1
+        for task in tasks:
+            if name in task.deps:
+                remaining[task.name] -= 1
+                if remaining[task.name] == 0:
+                    ready.append(task.name)
+    if seen != len(tasks):
+        cycle = sorted(name for name, count in remaining.items() if count > 0)
+        raise ValueError(f"Dependensi melingkar antara task: {cycle}")
+    return by_name
+
+
+def _run_with_retries(task: Task, result: TaskResult, log) -> TaskResult:
+    started = time.perf_counter()
+    for attempt in range(task.retries + 1):
+        result.attempts = attempt + 1
+        try:
+            task.func()
+            result.status, result.error = 'ok', None
+            break
+        except Exception as e:
+            result.status, result.error = 'failed', f"{type(e).__name__}: {e}"
+            if attempt < task.retries:
+                log(f"⚠️ Task {task.name} gagal (percobaan {attempt + 1}/{task.retries + 1}), mencoba ulang: {e}")
+                time.sleep(task.retry_delay * 2 ** attempt)
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def run_graph(tasks, max_workers: int = 4, log=print) -> dict:
+    """Run ``tasks`` on a thread pool, each as soon as all of its dependencies succeeded.
+
+    Independent tasks run concurrently (up to ``max_workers``). A task that
+    still fails after its retries marks every task depending on it, directly
+    or transitively, as 'skipped'; unrelated branches keep running.
+    Returns ``{name: TaskResult}`` in declaration order.
+    """
+    by_name = _check_graph(tasks)
+    results = {task.name: TaskResult(task.name) for task in tasks}
+    waiting = {task.name: set(task.deps) for task in tasks}
+    dependents = {task.name: [t.name for t in tasks if task.name in t.deps] for task in tasks}
+
+    def skip_dependents(name, failed):
+        # ``failed`` adalah task yang benar-benar gagal; ``name`` bisa task yang ikut dilewati
+        for child in dependents[name]:
+            if results[child].status == 'pending':
+                results[child].status = 'skipped'
+                results[child].error = (f"dependensi {name} gagal" if name == failed
+                                        else f"dependensi {name} dilewati karena {failed} gagal")
+                waiting.pop(child, None)
+                skip_dependents(child, failed)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='task') as pool:
+        running = {}
+
+        def submit_ready():
+            for name in [name for name, deps in waiting.items() if not deps]:
+                del waiting[name]
+                running[pool.submit(_run_with_retries, by_name[name], results[name], log)] = name
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                future.result()
+                if results[name].status == 'ok':
+                    for child in dependents[name]:
+                        if child in waiting:
+                            waiting[child].discard(name)
+                else:
+                    skip_dependents(name, name)
+            submit_ready()
+    return results
+
+
+def format_report(results: dict, total_seconds: float = None) -> str:
+    """Plain-text run report: one line per task with status, attempts and duration."""
+    icons = {'ok': '✅', 'failed': '❌', 'skipped': '⏭️'}
+    width = max((len(name) for name in results), default=0)
+    lines = [f"{'Task':<{width}}  Status   Percobaan  Durasi"]
+    for name, result in results.items():
+        line = f"{name:<{width}}  {icons.get(result.status, '?')} {result.status:<7} {result.attempts:>5}  {result.seconds:>8.2f}s"
+        if result.error:
+            line += f"  ({result.error})"
+        lines.append(line)
+    if total_seconds is not None:
+        busy = sum(result.seconds for result in results.values())
+        lines.append(f"Total {total_seconds:.2f}s (jumlah durasi task {busy:.2f}s)")
+    return '\n'.join(lines)
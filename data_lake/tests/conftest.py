@@ -0,0 +1,25 @@
+# Modul data_lake diimpor sebagai skrip top-level (mis. `from watermark import ...`)
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def pg_conn():
+    """Connection in a transaction that is rolled back; needs TEST_DATABASE_URL (PostgreSQL)."""
+    url = os.environ.get('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip("TEST_DATABASE_URL tidak diset")
+    from sqlalchemy import create_engine
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            yield conn
+        finally:
+            transaction.rollback()
+    engine.dispose()
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import ingest
+from ingest import CHECKPOINT_SUFFIX, PARQUET_SUCCESS_MARKER, PARTIAL_SUFFIX, Checkpoint, transfer_file
+
+
+def _write_csv(path, lines):
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+def test_parquet_chunks_with_changing_dtypes(tmp_path):
+    pytest.importorskip('pyarrow')
+    # Chunk pertama berisi integer, chunk berikutnya desimal & kosong di kolom yang sama
+    csv_path = _write_csv(tmp_path / 'sales.csv', ['qty,price', '1,10', '2,20', '3,2.5', ',4'])
+    dataset = tmp_path / 'sales'
+    assert ingest.write_csv_parquet(csv_path, dataset, chunk_size=2)
+    assert (dataset / PARQUET_SUCCESS_MARKER).exists()
+    assert not dataset.with_name(dataset.name + PARTIAL_SUFFIX).exists()
+
+    df = ingest.read_parquet_dataset(dataset)
+    assert df['qty'].tolist()[:3] == [1.0, 2.0, 3.0] and pd.isna(df['qty'].iloc[3])
+    assert df['price'].tolist() == [10.0, 20.0, 2.5, 4.0]
+
+
+def test_parquet_partitions_by_day(tmp_path):
+    pytest.importorskip('pyarrow')
+    csv_path = _write_csv(tmp_path / 'temp.csv', [
+        'timestamp,temperature_c', '2024-06-01 10:00,20', '2024-06-02 11:00,21.5', 'bad,22',
+    ])
+    dataset = tmp_path / 'temp'
+    assert ingest.write_csv_parquet(csv_path, dataset, partition_column='timestamp', chunk_size=2)
+    days = sorted(path.name for path in dataset.iterdir() if path.is_dir())
+    assert days == ['date=2024-06-01', 'date=2024-06-02', 'date=__unknown__']
+    assert ingest.read_parquet_dataset(dataset, start='2024-06-02', end='2024-06-02')['temperature_c'].tolist() == [21.5, 22.0]
+
+
+def _interrupted_transfer(src, dst, offset, prefix):
+    """Leave dst.part and its journal as a transfer killed after ``offset`` bytes would."""
+    dst.with_name(dst.name + PARTIAL_SUFFIX).write_bytes(prefix + b'garbage past the checkpoint')
+    st = src.stat()
+    dst.with_name(dst.name + CHECKPOINT_SUFFIX).write_text(json.dumps({
+        'source': {'size': st.st_size, 'mtime_ns': st.st_mtime_ns},
+        'state': {'offset': offset},
+    }), encoding='utf-8')
+
+
+def test_transfer_file_resumes_from_checkpoint(tmp_path):
+    src = tmp_path / 'src.bin'
+    src.write_bytes(bytes(range(256)) * 64)
+    dst = tmp_path / 'dst.bin'
+    # Awalan berbeda dari sumber: kalau transfer mulai dari nol, awalan ini tertimpa
+    _interrupted_transfer(src, dst, 100, b'x' * 100)
+
+    assert transfer_file(src, dst) == src.stat().st_size
+    data = dst.read_bytes()
+    assert data[:100] == b'x' * 100
+    assert data[100:] == src.read_bytes()[100:]
+    assert not dst.with_name(dst.name + PARTIAL_SUFFIX).exists()
+    assert not dst.with_name(dst.name + CHECKPOINT_SUFFIX).exists()
+
+
+def test_transfer_file_restarts_when_source_changed(tmp_path):
+    src = tmp_path / 'src.bin'
+    src.write_bytes(b'a' * 1000)
+    dst = tmp_path / 'dst.bin'
+    _interrupted_transfer(src, dst, 100, b'x' * 100)
+    src.write_bytes(b'b' * 2000)
+    os.utime(src, ns=(src.stat().st_atime_ns, src.stat().st_mtime_ns + 1))
+
+    assert Checkpoint(src, dst).state == {}
+    transfer_file(src, dst)
+    assert dst.read_bytes() == src.read_bytes()
@@ -0,0 +1,42 @@
+from time_dimension import build_dim_time
+
+
+def _row(dim, timestamp):
+    return dim.set_index('timestamp').loc[timestamp]
+
+
+def test_day_keys():
+    dim = build_dim_time('2024-02-28', '2024-03-01')
+    assert dim['time_id'].tolist() == [20240228, 20240229, 20240301]
+    assert (dim['grain'] == 'day').all()
+    assert (dim['hour'] == 0).all()
+    assert dim['date'].tolist() == ['2024-02-28', '2024-02-29', '2024-03-01']
+
+
+def test_hour_keys():
+    dim = build_dim_time('2024-12-31 22:00', '2025-01-01 01:00', grain='hour')
+    assert dim['time_id'].tolist() == [2024123122, 2024123123, 2025010100, 2025010101]
+    assert dim['hour'].tolist() == [22, 23, 0, 1]
+    # Key jam tidak bertabrakan dengan key hari
+    assert dim['time_id'].min() > build_dim_time('2099-12-31', '2099-12-31')['time_id'].max()
+
+
+def test_iso_week_across_year_boundary():
+    dim = build_dim_time('2024-12-29', '2025-01-06')
+    sunday, monday = _row(dim, '2024-12-29'), _row(dim, '2024-12-30')
+    assert (sunday['weekday'], sunday['iso_year'], sunday['iso_week']) == (7, 2024, 52)
+    assert (monday['weekday'], monday['iso_year'], monday['iso_week']) == (1, 2025, 1)
+    assert _row(dim, '2025-01-06')['iso_week'] == 2
+
+
+def test_fiscal_year_starts_in_july():
+    dim = build_dim_time('2024-06-30', '2024-07-01')
+    june, july = _row(dim, '2024-06-30'), _row(dim, '2024-07-01')
+    assert (june['fiscal_year'], june['fiscal_quarter'], june['fiscal_period']) == (2024, 4, 12)
+    assert (july['fiscal_year'], july['fiscal_quarter'], july['fiscal_period']) == (2025, 1, 1)
+    assert (july['year'], july['quarter']) == (2024, 3)
+
+
+def test_calendar_fiscal_year():
+    row = _row(build_dim_time('2024-06-30', '2024-06-30', fiscal_start_month=1), '2024-06-30')
+    assert (row['fiscal_year'], row['fiscal_period']) == (2024, 6)
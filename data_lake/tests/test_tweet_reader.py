@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import tweet_reader
+from tweet_reader import read_tweets
+
+ROWS = [
+    ['101', ' Helmet is great ', '2024-06-01 10:00:00', 'Jakarta', ' Positive', 'Helmet'],
+    ['abc', 'bad id', '2024-06-01 11:00:00', '', 'negative', 'Gloves'],
+    ['103', 'odd timestamp', '01/06/2024 12:00', 'Bandung', 'neutral', ''],
+    ['104', 'no timestamp', 'not a date', 'Surabaya', 'neutral', 'Helmet'],
+]
+
+
+@pytest.fixture(params=['pyarrow', 'c'])
+def tweets_path(request, tmp_path, monkeypatch):
+    if request.param == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(tweet_reader, 'PARSER_ENGINE', request.param)
+    path = tmp_path / 'tweets.txt'
+    path.write_text('\n'.join('\t'.join(row) for row in ROWS) + '\n', encoding='utf-8')
+    return path
+
+
+def test_bad_rows_dropped(tweets_path):
+    df = read_tweets(tweets_path)
+    assert df['tweet_id'].tolist() == [101, 103]
+    assert df['tweet_text'].tolist() == ['Helmet is great', 'odd timestamp']
+    assert df['sentiment'].astype(str).tolist() == ['positive', 'neutral']
+    assert df['matched_product'].astype(str).tolist() == ['Helmet', 'Unknown']
+    assert df['timestamp'].tolist() == [pd.Timestamp('2024-06-01 10:00'), pd.Timestamp('2024-01-06 12:00')]
+
+
+def test_bad_rows_kept_with_raw(tweets_path):
+    df, raw = read_tweets(tweets_path, drop_incomplete=False, with_raw=True)
+    assert len(df) == len(raw) == len(ROWS)
+    assert str(df['tweet_id'].dtype) == 'Int64'
+    assert pd.isna(df['tweet_id'].iloc[1]) and raw['tweet_id'].iloc[1] == 'abc'
+    assert pd.isna(df['timestamp'].iloc[3]) and raw['timestamp'].iloc[3] == 'not a date'
+    assert df['user_location'].astype(str).iloc[1] == 'Unknown'
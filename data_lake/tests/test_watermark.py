@@ -0,0 +1,70 @@
+import pandas as pd
+from sqlalchemy import text
+
+from watermark import high_watermark, retire_unresolved, unresolved_reasons
+
+
+def _rows():
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(['2024-06-02 14:00', '2024-06-02 12:00', '2024-06-02 13:00']),
+        'tweet_id': [902, 900, 901],
+    })
+
+
+def test_high_watermark_all_loaded():
+    assert high_watermark(_rows(), 'timestamp', 'tweet_id') == (pd.Timestamp('2024-06-02 14:00'), 902)
+
+
+def test_high_watermark_stops_before_unresolved_row():
+    df = _rows()
+    loaded = df['tweet_id'] != 901
+    assert high_watermark(df, 'timestamp', 'tweet_id', loaded=loaded) == (pd.Timestamp('2024-06-02 12:00'), 900)
+
+
+def test_high_watermark_none_when_first_row_unresolved():
+    df = _rows()
+    assert high_watermark(df, 'timestamp', 'tweet_id', loaded=df['tweet_id'] != 900) is None
+    assert high_watermark(df.iloc[:0], 'timestamp', 'tweet_id') is None
+
+
+def test_unresolved_reasons():
+    missing = pd.DataFrame({'unresolved:dim_tweet': [True, False, False], 'unresolved:dim_topic': [True, True, False]})
+    assert unresolved_reasons(missing).tolist() == ['unresolved:dim_tweet;unresolved:dim_topic',
+                                                    'unresolved:dim_topic', '']
+
+
+def test_never_resolving_row_is_retired(pg_conn):
+    pg_conn.execute(text("CREATE SCHEMA test_watermark"))
+    df = _rows()
+    df['topic_id'] = pd.array([1, 1, None], dtype='Int64')
+    resolved = df['topic_id'].notna()
+    unresolved = df.loc[~resolved]
+    reasons = unresolved_reasons(pd.DataFrame({'unresolved:dim_topic': ~resolved[~resolved]}))
+
+    for run in range(1, 4):
+        given_up = retire_unresolved(pg_conn, 'fact_test', unresolved, 'timestamp', 'tweet_id', reasons,
+                                     max_runs=3, schema='test_watermark')
+        loaded = resolved.copy()
+        loaded[unresolved.index[given_up]] = True
+        mark = high_watermark(df, 'timestamp', 'tweet_id', loaded=loaded)
+        if run < 3:
+            # Baris 901 menahan watermark selama masih ditunggu
+            assert not given_up.any()
+            assert mark == (pd.Timestamp('2024-06-02 12:00'), 900)
+    assert given_up.all()
+    assert mark == (pd.Timestamp('2024-06-02 14:00'), 902)
+    assert pg_conn.execute(text("SELECT count(*) FROM test_watermark.etl_pending")).scalar() == 0
+    assert pg_conn.execute(text(
+        "SELECT reasons FROM staging_quarantine WHERE table_name = 'fact_test'"
+    )).scalar() == 'unresolved:dim_topic;unresolved_runs:3'
+
+
+def test_row_outside_calendar_is_retired_at_once(pg_conn):
+    pg_conn.execute(text("CREATE SCHEMA test_watermark"))
+    unresolved = _rows().iloc[[0]]
+    given_up = retire_unresolved(pg_conn, 'fact_test', unresolved, 'timestamp', 'tweet_id',
+                                 pd.Series([''], index=unresolved.index), outside=[True], schema='test_watermark')
+    assert given_up.tolist() == [True]
+    assert pg_conn.execute(text(
+        "SELECT reasons FROM staging_quarantine WHERE table_name = 'fact_test'"
+    )).scalar() == 'outside:dim_time'
@@ -0,0 +1,152 @@
+# TIME DIMENSION: Generator dim_time Tervektorisasi (NumPy) untuk Grain Hari & Jam
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from bulk_load import copy_dataframe
+
+# AdventureWorks: tahun fiskal mulai 1 Juli dan diberi nama tahun berakhirnya (FY2025 = Jul 2024 - Jun 2025)
+FISCAL_YEAR_START_MONTH = 7
+# numpy datetime unit per grain
+GRAIN_UNITS = {'day': 'D', 'hour': 'h'}
+DIM_TIME_COLUMNS = [
+    'time_id', 'timestamp', 'year', 'month', 'day', 'hour', 'grain', 'date', 'quarter',
+    'weekday', 'iso_year', 'iso_week', 'fiscal_year', 'fiscal_quarter', 'fiscal_period',
+]
+
+DIM_TIME_DDL = """
+CREATE TABLE IF NOT EXISTS dwh.dim_time (
+    time_id INT NOT NULL UNIQUE,
+    timestamp TIMESTAMP NOT NULL,
+    year INT NOT NULL,
+    month INT NOT NULL,
+    day INT NOT NULL,
+    hour INT NOT NULL,
+    grain VARCHAR(4) NOT NULL DEFAULT 'day',
+    date DATE,
+    quarter SMALLINT,
+    weekday SMALLINT,
+    iso_year INT,
+    iso_week SMALLINT,
+    fiscal_year INT,
+    fiscal_quarter SMALLINT,
+    fiscal_period SMALLINT
+)
+"""
+
+# Kolom kalender untuk tabel dim_time lama (hanya time_id..hour) beserta isian satu kali dari timestamp
+_CALENDAR_COLUMNS = {
+    'grain': ("VARCHAR(4) NOT NULL DEFAULT 'day'", None),
+    'date': ('DATE', 'timestamp::date'),
+    'quarter': ('SMALLINT', 'EXTRACT(QUARTER FROM timestamp)'),
+    'weekday': ('SMALLINT', 'EXTRACT(ISODOW FROM timestamp)'),
+    'iso_year': ('INT', 'EXTRACT(ISOYEAR FROM timestamp)'),
+    'iso_week': ('SMALLINT', 'EXTRACT(WEEK FROM timestamp)'),
+    'fiscal_year': ('INT', f'year + CASE WHEN month >= {FISCAL_YEAR_START_MONTH} THEN 1 ELSE 0 END'),
+    'fiscal_quarter': ('SMALLINT', f'(month - {FISCAL_YEAR_START_MONTH} + 12) % 12 / 3 + 1'),
+    'fiscal_period': ('SMALLINT', f'(month - {FISCAL_YEAR_START_MONTH} + 12) % 12 + 1'),
+}
+
+
+def build_dim_time(start, end, grain: str = 'day', fiscal_start_month: int = FISCAL_YEAR_START_MONTH) -> pd.DataFrame:
+    """dim_time rows for every ``grain`` step in [start, end], computed with NumPy arithmetic.
+
+    Keys are YYYYMMDD for days and YYYYMMDDHH for hours, so both grains
+    share the table without colliding. Calendar attributes (quarter, ISO
+    weekday/week/year, fiscal year/quarter/period) are derived from the
+    datetime64 values directly; no per-row Python or string formatting.
+    """
+    unit = GRAIN_UNITS[grain]
+    first = np.datetime64(pd.Timestamp(start).to_datetime64(), unit)
+    last = np.datetime64(pd.Timestamp(end).to_datetime64(), unit)
+    stamps = np.arange(first, last + 1)
+
+    days = stamps.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    year = months.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months).astype(np.int64) + 1
+    hour = (stamps - days).astype('timedelta64[h]').astype(np.int64)
+
+    # 1970-01-01 adalah Kamis; ISO: Senin=1 .. Minggu=7, minggu milik tahun hari Kamisnya
+    weekday = (days.astype(np.int64) + 3) % 7 + 1
+    thursday = days + (4 - weekday)
+    iso_year = thursday.astype('datetime64[Y]').astype(np.int64) + 1970
+    iso_week = (thursday - thursday.astype('datetime64[Y]').astype('datetime64[D]')).astype(np.int64) // 7 + 1
+
+    fiscal_period = (month - fiscal_start_month) % 12 + 1
+    fiscal_year = year + (month >= fiscal_start_month) if fiscal_start_month > 1 else year
+
+    time_id = year * 10000 + month * 100 + day
+    if grain == 'hour':
+        time_id = time_id * 100 + hour
+
+    return pd.DataFrame({
+        'time_id': time_id,
+        'timestamp': stamps.astype('datetime64[s]'),
+        'year': year,
+        'month': month,
+        'day': day,
+        'hour': hour,
+        'grain': grain,
+        'date': np.datetime_as_string(days),
+        'quarter': (month - 1) // 3 + 1,
+        'weekday': weekday,
+        'iso_year': iso_year,
+        'iso_week': iso_week,
+        'fiscal_year': fiscal_year,
+        'fiscal_quarter': (fiscal_period - 1) // 3 + 1,
+        'fiscal_period': fiscal_period,
+    }, columns=DIM_TIME_COLUMNS)
+
+
+def ensure_dim_time_table(conn) -> None:
+    """Create dwh.dim_time, or add and fill the calendar columns on an older table, once."""
+    conn.execute(text(DIM_TIME_DDL))
+    existing = set(conn.execute(text(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = 'dwh' AND table_name = 'dim_time'"
+    )).scalars())
+    missing = [column for column in _CALENDAR_COLUMNS if column not in existing]
+    for column in missing:
+        conn.execute(text(f"ALTER TABLE dwh.dim_time ADD COLUMN {column} {_CALENDAR_COLUMNS[column][0]}"))
+    fills = [f"{column} = {_CALENDAR_COLUMNS[column][1]}" for column in missing if _CALENDAR_COLUMNS[column][1]]
+    if fills:
+        conn.execute(text(f"UPDATE dwh.dim_time SET {', '.join(fills)}"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS dim_time_grain_timestamp_idx ON dwh.dim_time (grain, timestamp)"))
+
+
+def extend_dim_time(conn, grain: str, start, end) -> pd.DataFrame:
+    """Append the ``grain`` rows after the current maximum timestamp (or from ``start``) up to ``end``.
+
+    Only the newest timestamp is read back, not every existing key; gaps
+    before it are not backfilled. Rows are bulk loaded with COPY. Returns
+    the inserted rows.
+    """
+    latest = conn.execute(text("SELECT max(timestamp) FROM dwh.dim_time WHERE grain = :grain"),
+                          {'grain': grain}).scalar()
+    step = pd.Timedelta(1, unit=GRAIN_UNITS[grain])
+    first = pd.Timestamp(latest) + step if latest is not None else pd.Timestamp(start)
+    if first > pd.Timestamp(end):
+        return build_dim_time(first, first - step, grain)
+    rows = build_dim_time(first, end, grain)
+    copy_dataframe(rows, 'dim_time', conn, schema='dwh')
+    return rows
+
+
+def calendar_range(conn, grain: str = 'day'):
+    """[first, end) covered by the ``grain`` rows of dwh.dim_time, or (None, None) when it has none."""
+    first, last = conn.execute(text("SELECT min(timestamp), max(timestamp) FROM dwh.dim_time WHERE grain = :grain"),
+                               {'grain': grain}).one()
+    if first is None:
+        return None, None
+    return pd.Timestamp(first), pd.Timestamp(last) + pd.Timedelta(1, unit=GRAIN_UNITS[grain])
+
+
+def outside_calendar(conn, timestamps, grain: str = 'day') -> np.ndarray:
+    """True for timestamps that can never get a ``grain`` time_id because they fall outside dim_time."""
+    first, end = calendar_range(conn, grain)
+    if first is None:
+        return np.zeros(len(timestamps), dtype=bool)
+    values = pd.Series(pd.to_datetime(timestamps))
+    return (~values.between(first, end, inclusive='left')).to_numpy(dtype=bool)
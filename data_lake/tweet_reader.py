@@ -0,0 +1,87 @@
+# TWEET READER: Parser Bersama File Tweet Terstruktur (TSV) dengan Dtype Eksplisit
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TWEET_COLUMNS = ['tweet_id', 'tweet_text', 'timestamp', 'user_location', 'sentiment', 'matched_product']
+TWEET_DTYPES = {
+    # Dibaca sebagai teks lalu dikonversi: satu id rusak tidak menggagalkan seluruh file
+    'tweet_id': 'string',
+    'tweet_text': 'string',
+    'timestamp': 'string',
+    'user_location': 'category',
+    'sentiment': 'category',
+    'matched_product': 'category',
+}
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+UNKNOWN = 'Unknown'
+# Kolom wajib; baris dengan nilai kosong di kolom ini dibuang (kecuali drop_incomplete=False)
+REQUIRED_COLUMNS = ['tweet_id', 'tweet_text', 'timestamp', 'sentiment']
+
+try:
+    import pyarrow  # noqa: F401
+    PARSER_ENGINE = 'pyarrow'
+except ImportError:
+    PARSER_ENGINE = 'c'
+
+
+def _normalize_categorical(series: pd.Series, lower: bool = False, fill: str = None) -> pd.Series:
+    """Strip (and optionally lowercase/fill) a categorical by touching only its categories.
+
+    The string work runs once per distinct value instead of once per row;
+    categories that collapse to the same text are merged by remapping codes.
+    """
+    categories = series.cat.categories.astype(str).str.strip()
+    if lower:
+        categories = categories.str.lower()
+    if fill is not None:
+        categories = categories.append(pd.Index([fill]))
+    remap, uniques = pd.factorize(categories)
+    codes = series.cat.codes.to_numpy()
+    missing = len(categories) - 1 if fill is not None else None
+    new_codes = np.where(codes >= 0, remap[codes], remap[missing] if missing is not None else -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=uniques), index=series.index, name=series.name)
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """Parse with the fixed tweet format; only rows that do not match fall back to inference."""
+    parsed = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors='coerce')
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], errors='coerce')
+    return parsed
+
+
+def read_tweets(path, normalize: bool = True, drop_incomplete: bool = True, with_raw: bool = False):
+    """Read a tab-separated tweet file (no header) into typed columns.
+
+    ``sentiment``, ``user_location`` and ``matched_product`` are categoricals,
+    ``tweet_id`` is a nullable integer (ids that are not numbers become <NA>)
+    and ``timestamp`` a datetime. With ``normalize`` text is stripped,
+    sentiment lowercased, missing locations and products become 'Unknown',
+    and rows missing a required field dropped unless ``drop_incomplete`` is
+    False (the caller validates them itself). ``with_raw`` returns
+    ``(df, raw)`` where ``raw`` holds the values as read, before conversion.
+    """
+    df = pd.read_csv(
+        Path(path),
+        sep='\t',
+        header=None,
+        names=TWEET_COLUMNS,
+        dtype=TWEET_DTYPES,
+        encoding='utf-8',
+        engine=PARSER_ENGINE,
+    )
+    raw = df.copy() if with_raw else None
+    df['tweet_id'] = pd.to_numeric(df['tweet_id'].str.strip(), errors='coerce').astype('Int64')
+    df['timestamp'] = parse_timestamps(df['timestamp'])
+    if normalize:
+        df['tweet_text'] = df['tweet_text'].str.strip()
+        df['user_location'] = _normalize_categorical(df['user_location'], fill=UNKNOWN)
+        df['sentiment'] = _normalize_categorical(df['sentiment'], lower=True)
+        df['matched_product'] = _normalize_categorical(df['matched_product'], fill=UNKNOWN)
+        if drop_incomplete:
+            df = df.dropna(subset=REQUIRED_COLUMNS)
+    return (df, raw) if with_raw else df
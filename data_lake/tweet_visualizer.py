@@ -1,16 +1,14 @@
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
-import pandas as pd
 import os
+from tweet_reader import read_tweets
 
 
 # Load structured .txt file and extract only tweet_text column
 base_dir = os.path.dirname(os.path.abspath(__file__))
 structured_txt_path = os.path.join(base_dir, "adventureworks", "tweets", "adventureworks_structured_150_tweets.txt")
 
-df = pd.read_csv(structured_txt_path, sep='\t', header=None, names=[
-    'tweet_id', 'tweet_text', 'timestamp', 'user_location', 'sentiment', 'matched_product'
-])
+df = read_tweets(structured_txt_path)
 
 
 # Gabungkan semua teks tweet
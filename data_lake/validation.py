@@ -0,0 +1,168 @@
+# VALIDATION: Aturan Validasi Deklaratif & Vektorisasi per Tabel Staging, dengan Karantina
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from bulk_load import copy_dataframe
+from staging_schema import SENTIMENT_LABELS
+
+logger = logging.getLogger(__name__)
+
+QUARANTINE_TABLE = 'staging_quarantine'
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A named check over a whole frame.
+
+    ``failing(typed, raw)`` returns a boolean Series marking rows that break
+    the rule; ``raw`` holds the values as read (before coercion) and may be
+    None when the caller only has typed data.
+    """
+    name: str
+    failing: Callable
+
+
+def required(column: str) -> Rule:
+    """Value is missing; with ``raw`` only rows empty in the source (unparseable values are ``parseable``'s)."""
+    def failing(typed, raw):
+        if raw is None or column not in raw:
+            return typed[column].isna()
+        return typed[column].isna() & raw[column].isna()
+    return Rule(f"required:{column}", failing)
+
+
+def parseable(column: str) -> Rule:
+    """Value was present in the source but could not be coerced to the column type."""
+    def failing(typed, raw):
+        if raw is None or column not in raw:
+            return pd.Series(False, index=typed.index)
+        return typed[column].isna() & raw[column].notna()
+    return Rule(f"unparseable:{column}", failing)
+
+
+def between(column: str, low, high) -> Rule:
+    def failing(typed, raw):
+        values = typed[column]
+        return values.notna() & ~values.between(low, high)
+    return Rule(f"out_of_range:{column}", failing)
+
+
+def timestamp_sane(column: str, earliest: str, future_tolerance: str = '1D') -> Rule:
+    """Timestamp is not before ``earliest`` and not later than now + ``future_tolerance``."""
+    def failing(typed, raw):
+        values = typed[column]
+        latest = pd.Timestamp.now() + pd.Timedelta(future_tolerance)
+        return values.notna() & ((values < pd.Timestamp(earliest)) | (values > latest))
+    return Rule(f"bad_timestamp:{column}", failing)
+
+
+def one_of(column: str, allowed) -> Rule:
+    allowed = list(allowed)
+    def failing(typed, raw):
+        values = typed[column]
+        return values.notna() & ~values.isin(allowed)
+    return Rule(f"not_allowed:{column}", failing)
+
+
+def unique(*columns: str) -> Rule:
+    """Duplicate natural key within the batch; the last occurrence is kept."""
+    return Rule(f"duplicate:{'+'.join(columns)}",
+                lambda typed, raw: typed.duplicated(subset=list(columns), keep='last'))
+
+
+# Aturan per tabel staging; semua aturan dievaluasi pada seluruh chunk sekaligus
+RULES = {
+    'staging_warehouse_temp_sensor': [
+        required('timestamp'), required('sensor_id'), required('temperature_c'),
+        parseable('timestamp'), parseable('temperature_c'),
+        between('temperature_c', -50.0, 80.0),
+        timestamp_sane('timestamp', '2000-01-01'),
+        unique('sensor_id', 'timestamp'),
+    ],
+    'staging_external_sentiment': [
+        required('tweet_id'), required('tweet_text'), required('timestamp'), required('sentiment'),
+        parseable('tweet_id'), parseable('timestamp'),
+        one_of('sentiment', SENTIMENT_LABELS),
+        timestamp_sane('timestamp', '2006-03-21'),  # tweet pertama
+        unique('tweet_id', 'timestamp'),
+    ],
+    'staging_market_share_report': [
+        required('competitor'), required('time_periode'), required('market_share_percent'),
+        parseable('market_share_percent'),
+        between('market_share_percent', 0.0, 100.0),
+        unique('competitor', 'time_periode'),
+    ],
+}
+
+
+def validate(typed: pd.DataFrame, table_name: str, raw: pd.DataFrame = None):
+    """Split ``typed`` into (valid rows, rejected rows) using ``RULES[table_name]``.
+
+    Each rule produces one boolean mask over the whole frame; reasons are
+    only assembled for the failing rows. ``rejected`` carries a ``reasons``
+    column ("rule;rule") and the offending record as read (``raw`` when given).
+    """
+    rules = RULES.get(table_name, [])
+    if not rules or typed.empty:
+        return typed, typed.iloc[0:0].assign(reasons=pd.Series(dtype=object))
+
+    failed = np.zeros(len(typed), dtype=bool)
+    reasons = np.full(len(typed), '', dtype=object)
+    for rule in rules:
+        mask = rule.failing(typed, raw).to_numpy(dtype=bool)
+        if not mask.any():
+            continue
+        reasons[mask] = np.where(failed[mask], reasons[mask] + ';' + rule.name, rule.name)
+        failed |= mask
+
+    if not failed.any():
+        return typed, typed.iloc[0:0].assign(reasons=pd.Series(dtype=object))
+    source = raw if raw is not None else typed
+    rejected = source.loc[failed].copy()
+    rejected['reasons'] = reasons[failed]
+    return typed.loc[~failed], rejected
+
+
+def ensure_quarantine_table(conn) -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+            quarantine_id BIGSERIAL PRIMARY KEY,
+            table_name VARCHAR(63) NOT NULL,
+            source VARCHAR(500),
+            reasons TEXT NOT NULL,
+            record JSONB NOT NULL,
+            quarantined_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+    conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {QUARANTINE_TABLE}_table_time_idx "
+        f"ON {QUARANTINE_TABLE} (table_name, quarantined_at)"
+    ))
+
+
+def quarantine(conn, rejected: pd.DataFrame, table_name: str, source=None) -> int:
+    """Write rejected rows (with their reasons) to ``staging_quarantine`` in the caller's transaction."""
+    if rejected.empty:
+        return 0
+    ensure_quarantine_table(conn)
+    record_columns = [col for col in rejected.columns if col != 'reasons']
+    records = rejected[record_columns].to_json(orient='records', lines=True, date_format='iso').splitlines()
+    rows = pd.DataFrame({
+        'table_name': table_name,
+        'source': None if source is None else str(source),
+        'reasons': rejected['reasons'].to_numpy(),
+        'record': records,
+        'quarantined_at': datetime.now(),
+    })
+    copy_dataframe(rows, QUARANTINE_TABLE, conn, if_exists='append')
+    counts = pd.Series(rejected['reasons'].str.split(';').explode()).value_counts()
+    logger.warning(f"{len(rejected)} baris {table_name} dikarantina: "
+                   + ', '.join(f"{reason}={count}" for reason, count in counts.items()))
+    return len(rejected)
@@ -0,0 +1,159 @@
+# WATERMARK: High-Watermark per Fact Table untuk Load Inkremental dari Staging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from validation import quarantine
+
+WATERMARK_TABLE = 'etl_watermark'
+PENDING_TABLE = 'etl_pending'
+# Jumlah run (tanpa jendela waktu) sebuah baris boleh tertunda karena key dimensi belum ada sebelum dikarantina
+MAX_UNRESOLVED_RUNS = 3
+
+
+def ensure_watermark_table(conn, schema: str = 'dwh') -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{WATERMARK_TABLE} (
+            fact_table VARCHAR(63) PRIMARY KEY,
+            last_timestamp TIMESTAMP NOT NULL,
+            last_id BIGINT NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def get_watermark(conn, fact_table: str, schema: str = 'dwh'):
+    """(last_timestamp, last_id) of the newest staging row already loaded into ``fact_table``, or None."""
+    row = conn.execute(text(
+        f"SELECT last_timestamp, last_id FROM {schema}.{WATERMARK_TABLE} WHERE fact_table = :fact_table"
+    ), {'fact_table': fact_table}).first()
+    return (row[0], row[1]) if row else None
+
+
+def set_watermark(conn, fact_table: str, last_timestamp, last_id, schema: str = 'dwh') -> None:
+    """Advance the watermark of ``fact_table``; it never moves backwards (e.g. after a window reload)."""
+    conn.execute(text(f"""
+        INSERT INTO {schema}.{WATERMARK_TABLE} AS w (fact_table, last_timestamp, last_id)
+        VALUES (:fact_table, :last_timestamp, :last_id)
+        ON CONFLICT (fact_table) DO UPDATE
+        SET last_timestamp = EXCLUDED.last_timestamp, last_id = EXCLUDED.last_id, updated_at = now()
+        WHERE (w.last_timestamp, w.last_id) < (EXCLUDED.last_timestamp, EXCLUDED.last_id)
+    """), {
+        'fact_table': fact_table,
+        'last_timestamp': pd.Timestamp(last_timestamp).to_pydatetime(),
+        'last_id': int(last_id),
+    })
+
+
+def after_watermark(mark, timestamp_column: str = 'timestamp', id_column: str = 'id'):
+    """SQL predicate and parameters selecting rows strictly after ``mark`` in (timestamp, id) order.
+
+    The plain ``>=`` on the timestamp lets PostgreSQL prune older
+    partitions; the row comparison breaks ties between rows sharing the
+    watermark timestamp. Returns ('TRUE', {}) when there is no watermark yet.
+    """
+    if mark is None:
+        return 'TRUE', {}
+    last_timestamp, last_id = mark
+    return (
+        f"{timestamp_column} >= :mark_timestamp AND ({timestamp_column}, {id_column}) > (:mark_timestamp, :mark_id)",
+        {'mark_timestamp': pd.Timestamp(last_timestamp).to_pydatetime(), 'mark_id': int(last_id)},
+    )
+
+
+def high_watermark(df: pd.DataFrame, timestamp_column: str = 'timestamp', id_column: str = 'id', loaded=None):
+    """Largest (timestamp, id) pair in ``df`` up to which every row is loaded, or None.
+
+    ``loaded`` (boolean mask aligned with ``df``) marks rows that reached the
+    fact table; the mark stops before the first row in (timestamp, id) order
+    that did not, so that row stays after the watermark and is retried.
+    """
+    order = df[[timestamp_column, id_column]].sort_values([timestamp_column, id_column])
+    if loaded is not None:
+        done = pd.Series(loaded, index=df.index).loc[order.index].to_numpy(dtype=bool)
+        order = order.iloc[:done.argmin()] if not done.all() else order
+    if order.empty:
+        return None
+    last = order.iloc[-1]
+    return last[timestamp_column], last[id_column]
+
+
+def ensure_pending_table(conn, schema: str = 'dwh') -> None:
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{PENDING_TABLE} (
+            fact_table VARCHAR(63) NOT NULL,
+            row_timestamp TIMESTAMP NOT NULL,
+            row_id BIGINT NOT NULL,
+            runs INT NOT NULL DEFAULT 1,
+            first_seen TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (fact_table, row_timestamp, row_id)
+        )
+    """))
+
+
+def unresolved_reasons(missing: pd.DataFrame) -> pd.Series:
+    """'reason;reason' per row from boolean columns named after the reason."""
+    labels = pd.Series([f"{column};" for column in missing.columns], index=missing.columns, dtype=object)
+    return missing.astype(bool).astype(object).dot(labels).str.rstrip(';')
+
+
+def retire_unresolved(conn, fact_table: str, unresolved: pd.DataFrame, timestamp_column: str, id_column: str,
+                      reasons: pd.Series, outside=None, max_runs: int = MAX_UNRESOLVED_RUNS, source=None,
+                      schema: str = 'dwh') -> np.ndarray:
+    """Count another run for every row in ``unresolved`` and quarantine the ones that will not resolve.
+
+    A row is given up when ``outside`` marks it (it can never get a key,
+    e.g. its timestamp is outside dim_time) or when it has now stayed
+    unresolved for ``max_runs`` runs. Those rows go to the quarantine table
+    with their ``reasons`` and leave the pending table. Returns a boolean
+    mask over ``unresolved`` of the rows given up; the caller may move the
+    watermark past them.
+    """
+    if unresolved.empty:
+        return np.zeros(0, dtype=bool)
+    ensure_pending_table(conn, schema)
+    timestamps = pd.to_datetime(unresolved[timestamp_column])
+    ids = unresolved[id_column].astype('int64')
+    keys = [
+        {'fact_table': fact_table, 'row_timestamp': ts.to_pydatetime(), 'row_id': int(row_id)}
+        for ts, row_id in zip(timestamps, ids)
+    ]
+    conn.execute(text(f"""
+        INSERT INTO {schema}.{PENDING_TABLE} AS p (fact_table, row_timestamp, row_id)
+        VALUES (:fact_table, :row_timestamp, :row_id)
+        ON CONFLICT (fact_table, row_timestamp, row_id) DO UPDATE SET runs = p.runs + 1
+    """), keys)
+    counts = pd.DataFrame(conn.execute(text(
+        f"SELECT row_timestamp, row_id, runs FROM {schema}.{PENDING_TABLE} WHERE fact_table = :fact_table"
+    ), {'fact_table': fact_table}).all(), columns=['row_timestamp', 'row_id', 'runs'])
+    known = pd.MultiIndex.from_arrays([pd.to_datetime(counts['row_timestamp']), counts['row_id'].astype('int64')])
+    runs = counts['runs'].to_numpy()[known.get_indexer(pd.MultiIndex.from_arrays([timestamps, ids]))]
+
+    outside = np.zeros(len(unresolved), dtype=bool) if outside is None else np.asarray(outside, dtype=bool)
+    given_up = outside | (runs >= max_runs)
+    if not given_up.any():
+        return given_up
+    why = np.where(outside, 'outside:dim_time', f'unresolved_runs:{max_runs}')[given_up]
+    rejected = unresolved.loc[given_up].copy()
+    prefix = reasons.loc[given_up].fillna('').to_numpy(dtype=object)
+    rejected['reasons'] = np.where(prefix != '', prefix + ';' + why, why)
+    quarantine(conn, rejected, fact_table, source)
+    conn.execute(text(f"""
+        DELETE FROM {schema}.{PENDING_TABLE}
+        WHERE fact_table = :fact_table AND row_timestamp = :row_timestamp AND row_id = :row_id
+    """), [key for key, gone in zip(keys, given_up) if gone])
+    return given_up
+
+
+def clear_pending(conn, fact_table: str, mark, schema: str = 'dwh') -> None:
+    """Forget pending rows at or before the watermark ``mark`` (they were loaded meanwhile)."""
+    ensure_pending_table(conn, schema)
+    conn.execute(text(f"""
+        DELETE FROM {schema}.{PENDING_TABLE}
+        WHERE fact_table = :fact_table AND (row_timestamp, row_id) <= (:last_timestamp, :last_id)
+    """), {
+        'fact_table': fact_table,
+        'last_timestamp': pd.Timestamp(mark[0]).to_pydatetime(),
+        'last_id': int(mark[1]),
+    })